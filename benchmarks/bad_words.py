@@ -0,0 +1,57 @@
+"""
+Сравнение проверки запрещённых слов: цикл по списку и автомат.
+
+Запуск из корня репозитория:
+    python benchmarks/bad_words.py --words 5000 --length 20000
+"""
+import argparse
+import random
+
+from common import measure, report, setup_django
+
+
+def loop_contains(words, text):
+    """Прежняя реализация CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--length', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_news')
+    from news.moderation import WordMatcher
+
+    rnd = random.Random(args.seed)
+    alphabet = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+    words = [
+        ''.join(rnd.choices(alphabet, k=rnd.randint(6, 12)))
+        for _ in range(args.words)
+    ]
+    # Случайный текст из тех же букв: совпадения редки, и цикл
+    # просматривает текст для каждого слова.
+    text = ''.join(
+        rnd.choice(alphabet + ' ') for _ in range(args.length)
+    )
+    matcher = WordMatcher(words)
+    assert loop_contains(words, text) == matcher.search(text)
+    report(
+        f'{args.words} слов, текст {args.length} символов:',
+        {
+            'цикл по BAD_WORDS': measure(lambda: loop_contains(words, text)),
+            'Aho–Corasick': measure(lambda: matcher.search(text)),
+        }
+    )
+    build_time = measure(lambda: WordMatcher(words), repeat=1)
+    print(f'  построение автомата      {build_time * 1000:10.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Общие функции для бенчмарков проектов YaNews и YaNote."""
+import os
+import sys
+import timeit
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+SETTINGS_MODULES = {
+    'ya_news': 'yanews.settings',
+    'ya_note': 'yanote.settings',
+}
+
+
+def setup_django(project):
+    """Подключает Django-проект из соседней директории."""
+    import django
+
+    sys.path.insert(0, str(ROOT_DIR / project))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', SETTINGS_MODULES[project])
+    django.setup()
+
+
+def measure(func, number=1, repeat=5):
+    """Лучшее время одного вызова func в секундах."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def report(title, results):
+    """Печатает таблицу «вариант — время — ускорение»."""
+    print(title)
+    baseline = next(iter(results.values()))
+    for name, seconds in results.items():
+        print(
+            f'  {name:<24} {seconds * 1000:10.3f} ms'
+            f'  x{baseline / seconds:.1f}'
+        )
@@ -0,0 +1,65 @@
+"""
+Конкурентная запись комментариев с настройками базы, групповой записью
+и без них.
+
+Для каждого профиля loadtest.py запускается в отдельном процессе:
+настройки DATABASES читаются из окружения при старте Django.
+
+Запуск из корня репозитория:
+    python benchmarks/db_tuning.py --requests 500 --workers 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+LOADTEST = Path(__file__).resolve().parent / 'loadtest.py'
+PROFILES = {
+    'default': {
+        'DB_SQLITE_TUNING': '0', 'DB_CONN_MAX_AGE': '0',
+        'DB_TRANSACTION_MODE': 'DEFERRED',
+    },
+    # PRAGMA и постоянные соединения без BEGIN IMMEDIATE: ошибки
+    # "database is locked" при записи остаются.
+    'tuned-deferred': {
+        'DB_SQLITE_TUNING': '1', 'DB_CONN_MAX_AGE': '60',
+        'DB_TRANSACTION_MODE': 'DEFERRED',
+    },
+    'tuned': {
+        'DB_SQLITE_TUNING': '1', 'DB_CONN_MAX_AGE': '60',
+        'DB_TRANSACTION_MODE': 'IMMEDIATE',
+    },
+    # Групповая запись комментариев, на YaNote не влияет.
+    'write-queue': {
+        'DB_SQLITE_TUNING': '1', 'DB_CONN_MAX_AGE': '60',
+        'DB_TRANSACTION_MODE': 'IMMEDIATE',
+        'NEWS_COMMENT_WRITE_QUEUE': '1',
+    },
+}
+SCENARIOS = {
+    'ya_news': 'comment POST',
+    'ya_note': 'notes:add',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--project', choices=SCENARIOS, default='ya_news')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+    for profile, env in PROFILES.items():
+        print(f'Профиль {profile}: {env}')
+        subprocess.run(
+            [sys.executable, LOADTEST, '--project', args.project,
+             '--scenario', SCENARIOS[args.project],
+             '--requests', str(args.requests),
+             '--workers', str(args.workers),
+             '--label', f'db-{profile}'],
+            env=dict(os.environ, **env), check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""
+Нагрузочный тест YaNews и YaNote через WSGI-приложение проекта.
+
+Скрипт создаёт временную базу, наполняет её данными заданного объёма,
+гоняет сценарии по настоящим маршрутам в несколько потоков и дописывает
+пропускную способность и перцентили задержек в JSON-файл, чтобы
+сравнивать прогоны между собой.
+
+Запуск из корня репозитория:
+    python benchmarks/loadtest.py --news 200 --comments 50 --notes 1000
+"""
+import argparse
+import io
+import json
+import math
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.parse import urlencode
+
+from common import ROOT_DIR, setup_django
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+PASSWORD = 'benchmark-password'
+
+
+class WSGIClient:
+    """Минимальный клиент: вызывает WSGI-приложение без сети."""
+
+    def __init__(self, app, cookies=None):
+        self.app = app
+        self.cookies = dict(cookies or {})
+
+    def request(self, method, path, data=None):
+        body = urlencode(data or {}).encode()
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            ),
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'http',
+            'wsgi.version': (1, 0),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split()[0])
+            response['headers'] = headers
+
+        result = self.app(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        for name, value in response['headers']:
+            if name.lower() == 'set-cookie':
+                for morsel in SimpleCookie(value).values():
+                    self.cookies[morsel.key] = morsel.value
+        return response['status'], content
+
+    def csrf_token(self, path):
+        """Открывает страницу с формой и возвращает её CSRF-токен."""
+        _, content = self.request('GET', path)
+        return CSRF_INPUT.search(content.decode()).group(1)
+
+
+def percentile(values, percent):
+    return values[max(math.ceil(len(values) * percent / 100) - 1, 0)]
+
+
+def run_scenario(name, make_request, requests, workers):
+    """Выполняет make_request() requests раз в workers потоков."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def task():
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            ok = make_request()
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        for _ in range(requests):
+            pool.submit(task)
+    wall_time = time.perf_counter() - started
+    latencies.sort()
+    result = {
+        'requests': requests,
+        'errors': errors,
+        'throughput_rps': round(requests / wall_time, 1),
+        **{
+            f'p{percent}_ms': round(percentile(latencies, percent), 2)
+            for percent in (50, 95, 99)
+        },
+    }
+    print(
+        f'  {name:<16} {result["throughput_rps"]:>8} rps  '
+        f'p50 {result["p50_ms"]:>7} ms  p95 {result["p95_ms"]:>7} ms  '
+        f'p99 {result["p99_ms"]:>7} ms  ошибок {errors}'
+    )
+    return result
+
+
+def login_clients(app, users):
+    """WSGI-клиенты с сессиями пользователей."""
+    from django.test import Client
+
+    clients = []
+    for user in users:
+        client = Client()
+        client.force_login(user)
+        clients.append(WSGIClient(app, {
+            name: morsel.value for name, morsel in client.cookies.items()
+        }))
+    return clients
+
+
+def make_users(count):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    User = get_user_model()
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(username=f'bench-{index}', password=password)
+        for index in range(count)
+    )
+    return list(User.objects.filter(username__startswith='bench-'))
+
+
+def bench_ya_news(app, args, rnd):
+    from news.models import Comment, News
+
+    today = datetime.today()
+    News.objects.bulk_create(
+        News(
+            title=f'Новость {index}',
+            text='Текст новости. ' * 30,
+            date=today - timedelta(days=index),
+        )
+        for index in range(args.news)
+    )
+    users = make_users(args.users)
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    for news_id in news_ids:
+        Comment.objects.bulk_create(
+            Comment(news_id=news_id, author=rnd.choice(users), text='Текст')
+            for _ in range(args.comments)
+        )
+    anonymous = WSGIClient(app)
+    clients = login_clients(app, users)
+    tokens = {}
+
+    def post_comment():
+        client = rnd.choice(clients)
+        news_id = rnd.choice(news_ids)
+        path = f'/news/{news_id}/'
+        if id(client) not in tokens:
+            tokens[id(client)] = client.csrf_token(path)
+        status, _ = client.request('POST', path, {
+            'text': 'Комментарий из нагрузочного теста',
+            'csrfmiddlewaretoken': tokens[id(client)],
+        })
+        return status == 302
+
+    return {
+        'news:home': lambda: anonymous.request('GET', '/')[0] == 200,
+        'news:detail': lambda: anonymous.request(
+            'GET', f'/news/{rnd.choice(news_ids)}/'
+        )[0] == 200,
+        'news:detail auth': lambda: rnd.choice(clients).request(
+            'GET', f'/news/{rnd.choice(news_ids)}/'
+        )[0] == 200,
+        'comment POST': post_comment,
+    }
+
+
+def bench_ya_note(app, args, rnd):
+    from notes.models import Note
+
+    users = make_users(args.users)
+    Note.objects.bulk_create(
+        Note(
+            title=f'Заметка {index}',
+            text='Текст заметки. ' * 20,
+            slug=f'note-{user.pk}-{index}',
+            author=user,
+        )
+        for user in users
+        for index in range(args.notes)
+    )
+    clients = login_clients(app, users)
+    tokens = {}
+
+    def add_note():
+        client = rnd.choice(clients)
+        if id(client) not in tokens:
+            tokens[id(client)] = client.csrf_token('/add/')
+        status, _ = client.request('POST', '/add/', {
+            'title': 'Популярный заголовок',
+            'text': 'Текст',
+            'csrfmiddlewaretoken': tokens[id(client)],
+        })
+        return status == 302
+
+    return {
+        'notes:list': lambda: rnd.choice(clients).request(
+            'GET', '/notes/'
+        )[0] == 200,
+        'notes:add': add_note,
+    }
+
+
+SCENARIOS = {
+    'ya_news': bench_ya_news,
+    'ya_note': bench_ya_note,
+}
+
+
+def run_project(args):
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(args.project)
+        from django.conf import settings
+        from django.core.management import call_command
+        from django.core.wsgi import get_wsgi_application
+
+        settings.DEBUG = False
+        database = settings.DATABASES['default']
+        database['NAME'] = Path(directory) / 'db.sqlite3'
+        call_command('migrate', verbosity=0)
+        app = get_wsgi_application()
+        rnd = random.Random(args.seed)
+        scenarios = SCENARIOS[args.project](app, args, rnd)
+        print(
+            f'{args.project}: {args.requests} запросов, '
+            f'{args.workers} потоков'
+        )
+        return {
+            name: run_scenario(name, request, args.requests, args.workers)
+            for name, request in scenarios.items()
+            if not args.scenario or name in args.scenario
+        }
+
+
+def save_results(path, run):
+    path = Path(path)
+    runs = json.loads(path.read_text()) if path.exists() else []
+    runs.append(run)
+    path.write_text(json.dumps(runs, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--project', choices=(*SCENARIOS, 'all'), default='all'
+    )
+    parser.add_argument('--news', type=int, default=100)
+    parser.add_argument('--comments', type=int, default=20,
+                        help='Комментариев на новость.')
+    parser.add_argument('--notes', type=int, default=100,
+                        help='Заметок на пользователя.')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=500,
+                        help='Запросов на сценарий.')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenario', action='append',
+                        help='Запустить только указанные сценарии.')
+    parser.add_argument('--label', default='',
+                        help='Метка прогона в файле результатов.')
+    parser.add_argument(
+        '--output', default=str(ROOT_DIR / 'benchmarks' / 'results.json')
+    )
+    args = parser.parse_args()
+    if args.project == 'all':
+        # Проекты не уживаются в одном процессе: у каждого свои settings.
+        for project in SCENARIOS:
+            subprocess.run(
+                [sys.executable, __file__, *sys.argv[1:],
+                 '--project', project],
+                check=True
+            )
+        return
+    save_results(args.output, {
+        'project': args.project,
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'params': {
+            key: value for key, value in vars(args).items()
+            if key not in ('project', 'output')
+        },
+        'results': run_project(args),
+    })
+
+
+if __name__ == '__main__':
+    main()
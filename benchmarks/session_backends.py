@@ -0,0 +1,58 @@
+"""
+Чтение страниц авторизованными пользователями с разными хранилищами
+сессий и с кешем пользователя и без него.
+
+Для каждого профиля loadtest.py запускается в отдельном процессе:
+SESSION_ENGINE, USER_CACHE_TIMEOUT и CACHES читаются из окружения
+при старте Django.
+
+Запуск из корня репозитория:
+    python benchmarks/session_backends.py --requests 500 --workers 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+LOADTEST = Path(__file__).resolve().parent / 'loadtest.py'
+# Кеш пользователя работает только с общим кешем, а не с locmem.
+USER_CACHE = {
+    'USER_CACHE_TIMEOUT': '60',
+    'NEWS_CACHE_BACKEND': 'file',
+    'NOTES_CACHE_BACKEND': 'file',
+}
+PROFILES = {
+    'db': {'SESSION_BACKEND': 'db', 'USER_CACHE_TIMEOUT': '0'},
+    'db+user-cache': {'SESSION_BACKEND': 'db', **USER_CACHE},
+    'cached_db+user-cache': {'SESSION_BACKEND': 'cached_db', **USER_CACHE},
+    'signed_cookies+user-cache': {
+        'SESSION_BACKEND': 'signed_cookies', **USER_CACHE,
+    },
+}
+SCENARIOS = {
+    'ya_news': 'news:detail auth',
+    'ya_note': 'notes:list',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--project', choices=SCENARIOS, default='ya_note')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+    for profile, env in PROFILES.items():
+        print(f'Профиль {profile}: {env}')
+        subprocess.run(
+            [sys.executable, LOADTEST, '--project', args.project,
+             '--scenario', SCENARIOS[args.project],
+             '--requests', str(args.requests),
+             '--workers', str(args.workers),
+             '--label', f'session-{profile}'],
+            env=dict(os.environ, **env), check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Транслитерация заголовков заметок: pytils.slugify и кеш LRU.
+
+Запуск из корня репозитория:
+    python benchmarks/slugify.py --titles 100000 --unique 500
+"""
+import argparse
+import random
+
+from common import measure, report, setup_django
+
+WORDS = (
+    'заметка', 'список', 'покупок', 'идеи', 'для', 'проекта', 'встреча',
+    'с', 'командой', 'планы', 'на', 'неделю', 'отпуск', 'рецепт', 'борща',
+    'книги', 'прочитать', 'тренировка', 'понедельник', 'отчёт',
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--unique', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django('ya_note')
+    from pytils.translit import slugify
+
+    from notes.slugs import cached_slugify, slugify_cache_info
+
+    rnd = random.Random(args.seed)
+    unique_titles = [
+        ' '.join(rnd.choices(WORDS, k=rnd.randint(2, 6))).capitalize()
+        for _ in range(args.unique)
+    ]
+    titles = rnd.choices(unique_titles, k=args.titles)
+
+    def run(func):
+        for title in titles:
+            func(title)
+
+    def run_cached():
+        cached_slugify.cache_clear()
+        run(cached_slugify)
+
+    report(
+        f'{args.titles} заголовков, из них уникальных {args.unique}:',
+        {
+            'pytils.slugify': measure(lambda: run(slugify), repeat=3),
+            'cached_slugify': measure(run_cached, repeat=3),
+        }
+    )
+    info = slugify_cache_info()
+    print(f'  попаданий {info.hits}, промахов {info.misses}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Параллельный запуск тестов YaNews и YaNote.
+
+Тесты каждого проекта делятся между процессами pytest, у каждого
+процесса своя SQLite-база. Базы не мигрируются заново: миграции
+прогоняются один раз в шаблон, который затем копируется для каждого
+процесса. Оба проекта выполняются одновременно, результаты собираются
+из JUnit XML в общую сводку.
+
+Запуск не бесплатен: шаблон базы и сбор тестов стоят около 1,5 с на
+проект, старт каждого процесса pytest — около 0,8 с. При W ядрах
+параллельный прогон проекта выигрывает, только если его
+последовательное время T больше 1,5 + 0,8 + T / W секунд, то есть для
+W = 4 — от 3 с на проект. Процессы сверх числа ядер лишь добавляют
+накладные расходы. Сейчас оба набора тестов идут около 8 с подряд; на
+одном ядре тот же прогон занимает 9,1 с с -n 1 и 11,8 с с -n 3.
+Поэтому run_tests.sh запускает тесты параллельно только с --parallel.
+
+Запуск из корня репозитория:
+    python parallel_tests.py --workers 4
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from xml.etree import ElementTree
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECTS = {
+    'ya_news': 'yanews.settings',
+    'ya_note': 'yanote.settings',
+}
+
+
+def build_template():
+    """Создаёт мигрированную тестовую базу по пути из TEST_DB_NAME."""
+    import django
+
+    sys.path.insert(0, os.getcwd())
+    django.setup()
+    from django.db import connection
+
+    connection.creation.create_test_db(
+        verbosity=0, keepdb=True, serialize=False
+    )
+    connection.close()
+
+
+def project_env(project, database=None):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=PROJECTS[project])
+    if database:
+        env['TEST_DB_NAME'] = str(database)
+    return env
+
+
+def collect(project):
+    """Идентификаторы тестов проекта, сгруппированные для распределения."""
+    result = subprocess.run(
+        [sys.executable, '-m', 'pytest', '--collect-only', '-q',
+         '-o', 'addopts=', '-p', 'no:cacheprovider'],
+        cwd=BASE_DIR / project, env=project_env(project),
+        capture_output=True, text=True, check=True,
+    )
+    groups = {}
+    for line in result.stdout.splitlines():
+        if '::' not in line:
+            continue
+        # Параметры одного теста и методы одного класса держим вместе:
+        # у них общие фикстуры и setUpTestData.
+        node = line.split('[', 1)[0]
+        key = node.rsplit('::', 1)[0] if node.count('::') > 1 else node
+        groups[key] = groups.get(key, 0) + 1
+    return groups
+
+
+def split(groups, workers):
+    """Раскладывает группы по процессам, начиная с самых больших."""
+    shards = [[0, []] for _ in range(min(workers, len(groups)))]
+    for key, size in sorted(groups.items(), key=lambda item: -item[1]):
+        shard = min(shards, key=lambda shard: shard[0])
+        shard[0] += size
+        shard[1].append(key)
+    return [keys for _, keys in shards]
+
+
+def start_project(project, workers, directory):
+    """Готовит шаблон базы и запускает процессы pytest проекта."""
+    cwd = BASE_DIR / project
+    template = directory / f'{project}-template.sqlite3'
+    subprocess.run(
+        [sys.executable, __file__, '--build-template'],
+        cwd=cwd, env=project_env(project, template), check=True,
+    )
+    processes = []
+    for number, keys in enumerate(split(collect(project), workers)):
+        database = directory / f'{project}-{number}.sqlite3'
+        shutil.copyfile(template, database)
+        report = directory / f'{project}-{number}.xml'
+        output = open(directory / f'{project}-{number}.log', 'w+')
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'pytest', '--reuse-db', '--tb=short',
+             f'--junitxml={report}', *keys],
+            cwd=cwd, env=project_env(project, database),
+            stdout=output, stderr=subprocess.STDOUT,
+        )
+        processes.append((process, report, output))
+    return processes
+
+
+def read_report(path):
+    """Счётчики и упавшие тесты из отчёта JUnit XML."""
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    failed = []
+    if not path.exists():
+        return totals, failed
+    for suite in ElementTree.parse(path).iter('testsuite'):
+        for name in totals:
+            totals[name] += int(suite.get(name, 0))
+        for case in suite.iter('testcase'):
+            for problem in case.findall('failure') + case.findall('error'):
+                message = (problem.get('message') or '').split('\n')[0]
+                failed.append(
+                    f'{case.get("classname")}::{case.get("name")}: {message}'
+                )
+    return totals, failed
+
+
+def finish_project(project, processes):
+    """Дожидается процессов проекта и печатает сводку; True — успех."""
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    success = True
+    for process, report, output in processes:
+        process.wait()
+        counts, failed = read_report(report)
+        for name in totals:
+            totals[name] += counts[name]
+        if process.returncode != 0:
+            success = False
+            output.seek(0)
+            sys.stderr.write(output.read())
+            for line in failed:
+                print(f'  FAILED {line}')
+        output.close()
+    print(
+        f'{project}: тестов {totals["tests"]}, '
+        f'ошибок {totals["failures"] + totals["errors"]}, '
+        f'пропущено {totals["skipped"]}, процессов {len(processes)}'
+    )
+    return success
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-n', '--workers', type=int, default=os.cpu_count(),
+        help='Процессов pytest на проект.'
+    )
+    parser.add_argument(
+        '--project', choices=PROJECTS, action='append',
+        help='Запустить только указанные проекты.'
+    )
+    parser.add_argument('--build-template', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.build_template:
+        build_template()
+        return 0
+    if args.workers > (os.cpu_count() or 1):
+        print(
+            f'Процессов ({args.workers}) больше, чем ядер '
+            f'({os.cpu_count()}): прогон будет медленнее.',
+            file=sys.stderr
+        )
+    started = time.monotonic()
+    with tempfile.TemporaryDirectory() as directory:
+        running = {
+            project: start_project(
+                project, max(args.workers, 1), Path(directory)
+            )
+            for project in args.project or PROJECTS
+        }
+        results = [
+            finish_project(project, processes)
+            for project, processes in running.items()
+        ]
+    print(f'Время: {time.monotonic() - started:.1f} с')
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,6 +21,18 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
+        if [[ "$1" == "--parallel" ]]; then
+            # Тесты обоих проектов параллельно, по процессу на ядро.
+            # Только по запросу: на малом наборе тестов или одном ядре
+            # запуск процессов дороже выигрыша (см. parallel_tests.py).
+            shift
+            python parallel_tests.py "$@" 1>&2
+            status=$?
+            if [[ $status -ne 0 ]]; then
+                print_message " При параллельном запуске упали тесты. Проверьте вывод выше " "=" 1
+            fi
+            exit $status
+        fi
         cd ya_news
         export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
         if pytest --tb=line 1>&2;
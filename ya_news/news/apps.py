@@ -1,7 +1,29 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from yacommon import db
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from yacommon import auth
+
+        from . import signals
+
+        connection_created.connect(db.tune_sqlite)
+        post_save.connect(auth.forget_user, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(auth.forget_user, sender=settings.AUTH_USER_MODEL)
+        pre_delete.connect(
+            signals.remember_comment_news, sender=settings.AUTH_USER_MODEL
+        )
+        post_delete.connect(
+            signals.recount_comment_news, sender=settings.AUTH_USER_MODEL
+        )
+        if settings.DB_HEALTH_CHECKS:
+            request_started.connect(db.check_connections)
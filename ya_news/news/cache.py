@@ -0,0 +1,124 @@
+"""
+Кеширование страниц новостей для анонимных пользователей.
+
+Ключ страницы включает версии областей кеша: общую, главной страницы
+и конкретной новости. Инвалидация лишь меняет версию, поэтому
+устаревшие страницы больше не читаются и вытесняются бэкендом сами.
+
+Версии хранятся в кеше по умолчанию. LocMemCache у каждого процесса
+свой, и инвалидация в одном процессе не видна другим: при нескольких
+процессах сервера нужен общий кеш (NEWS_CACHE_BACKEND=file).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+from django.http import QueryDict
+
+GLOBAL_SCOPE = 'all'
+HOME_SCOPE = 'home'
+
+
+def detail_scope(news_id):
+    return f'detail:{news_id}'
+
+
+def _version_key(scope):
+    return f'news:version:{scope}'
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def get_version(scope):
+    """
+    Текущая версия области кеша вместе с общей.
+
+    Меняется при каждой инвалидации области, поэтому годится и для
+    ETag страниц, которые зависят от многих новостей.
+    """
+    keys = (_version_key(GLOBAL_SCOPE), _version_key(scope))
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return '{}:{}:{}'.format(versions[keys[0]], scope, versions[keys[1]])
+
+
+def get_page_key(scope, path):
+    """
+    Ключ страницы с учётом текущих версий областей кеша.
+
+    path — путь вместе с параметрами, от которых зависит страница.
+    """
+    path_hash = hashlib.md5(path.encode()).hexdigest()
+    return f'news:page:{get_version(scope)}:{path_hash}'
+
+
+def invalidate(*scopes):
+    """Делает недействительными закешированные страницы областей."""
+    cache.set_many(
+        {_version_key(scope): _new_version() for scope in scopes},
+        timeout=None
+    )
+
+
+def invalidate_news(*news_ids):
+    """Сбрасывает главную страницу и страницы указанных новостей."""
+    invalidate(HOME_SCOPE, *(detail_scope(pk) for pk in news_ids))
+
+
+def invalidate_all():
+    invalidate(GLOBAL_SCOPE)
+
+
+class AnonymousCacheMixin:
+    """
+    Отдаёт анонимным пользователям готовые ответы из кеша.
+
+    Область кеша задаётся атрибутом cache_scope или, если она зависит
+    от запроса, методом get_cache_scope(). В ключ входят только
+    параметры запроса из cache_params: иначе произвольные ?x=1, ?x=2
+    сохраняли бы новые копии страницы и вытесняли нужные.
+    """
+    cache_scope = None
+    cache_params = ()
+
+    def get_cache_scope(self):
+        if self.cache_scope is None:
+            raise ImproperlyConfigured(
+                f'{self.__class__.__name__} требует cache_scope '
+                'или get_cache_scope().'
+            )
+        return self.cache_scope
+
+    def get_cache_path(self):
+        params = QueryDict(mutable=True)
+        for name in self.cache_params:
+            if name in self.request.GET:
+                params.setlist(name, self.request.GET.getlist(name))
+        if not params:
+            return self.request.path
+        return f'{self.request.path}?{params.urlencode()}'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = get_page_key(self.get_cache_scope(), self.get_cache_path())
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = settings.NEWS_CACHE_TIMEOUT
+            if getattr(response, 'is_rendered', True):
+                cache.set(key, response, timeout)
+            else:
+                response.add_post_render_callback(
+                    lambda response: cache.set(key, response, timeout)
+                )
+        return response
@@ -0,0 +1,62 @@
+"""Анонсы новостей: начало текста для главной страницы и поиска."""
+from django.db import models
+from django.utils import timezone
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 15
+
+
+def make_excerpt(text):
+    """Первые слова текста так же, как их обрезает truncatewords."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+class ExcerptField(models.TextField):
+    """
+    Анонс, который вычисляется из текста при каждом сохранении.
+
+    pre_save вызывается и для bulk_create, поэтому анонс заполняют
+    и импорт, и массовое создание без переопределения save().
+    """
+
+    def __init__(self, *args, source='text', **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        # Для миграций это обычный TextField: source влияет только
+        # на сохранение, и миграции не зависят от этого модуля.
+        name, _, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.TextField', args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = make_excerpt(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def fill_excerpts(queryset, batch_size=1000):
+    """
+    Пересчитывает анонсы пачками по первичному ключу.
+
+    bulk_update не применяет auto_now, поэтому modified выставляется
+    явно: иначе ETag и Last-Modified новостей не изменились бы.
+    """
+    last_pk = 0
+    count = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .only('pk', 'text')[:batch_size]
+        )
+        if not batch:
+            return count
+        now = timezone.now()
+        for news in batch:
+            news.excerpt = make_excerpt(news.text)
+            news.modified = now
+        queryset.model.objects.bulk_update(batch, ('excerpt', 'modified'))
+        count += len(batch)
+        last_pk = batch[-1].pk
@@ -0,0 +1,89 @@
+"""Потоковая выгрузка новостей с комментариями в JSON Lines и CSV."""
+import csv
+import json
+import tempfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, News
+
+CSV_HEADER = ('model', 'id', 'news_id', 'date', 'title', 'author', 'text')
+
+
+def iter_news_with_comments(chunk_size=2000):
+    """
+    Новости по порядку id, за каждой — её комментарии.
+
+    Обе таблицы читаются курсорами iterator() и сливаются по news_id,
+    поэтому в памяти не больше одной пачки строк каждой таблицы.
+    """
+    comments = Comment.objects.select_related('author').order_by(
+        'news_id', 'pk'
+    ).iterator(chunk_size=chunk_size)
+    comment = next(comments, None)
+    for news in News.objects.order_by('pk').iterator(chunk_size=chunk_size):
+        yield news
+        while comment is not None and comment.news_id <= news.pk:
+            if comment.news_id == news.pk:
+                yield comment
+            comment = next(comments, None)
+
+
+def to_fixture(obj):
+    """Запись в формате фикстур Django, её понимает import_news."""
+    if isinstance(obj, News):
+        fields = {'title': obj.title, 'text': obj.text, 'date': obj.date}
+    else:
+        fields = {
+            'news': obj.news_id,
+            'author': obj.author_id,
+            'text': obj.text,
+            'created': obj.created,
+            'is_hidden': obj.is_hidden,
+        }
+    return {'model': obj._meta.label_lower, 'pk': obj.pk, 'fields': fields}
+
+
+def to_csv_row(obj):
+    if isinstance(obj, News):
+        return ('news.news', obj.pk, obj.pk, obj.date, obj.title, '', obj.text)
+    return (
+        'news.comment', obj.pk, obj.news_id, obj.created, '',
+        obj.author.username, obj.text
+    )
+
+
+def iter_jsonl(records):
+    for obj in records:
+        yield json.dumps(
+            to_fixture(obj), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+class Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(records):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for obj in records:
+        yield writer.writerow(to_csv_row(obj))
+
+
+def spool(chunks):
+    """Записывает выгрузку во временный файл и возвращает его."""
+    file = tempfile.TemporaryFile()
+    for chunk in chunks:
+        file.write(chunk.encode())
+    file.seek(0)
+    return file
+
+
+FORMATS = {
+    'jsonl': (iter_jsonl, 'application/x-ndjson'),
+    'csv': (iter_csv, 'text/csv'),
+}
@@ -0,0 +1,29 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from news.export import FORMATS, iter_news_with_comments
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает новости с комментариями в JSON Lines или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=FORMATS, default='jsonl', dest='format'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        serialize, _ = FORMATS[options['format']]
+        records = iter_news_with_comments(options['chunk_size'])
+        if options['output']:
+            with open(
+                options['output'], 'w', encoding='utf-8', newline=''
+            ) as file:
+                file.writelines(serialize(records))
+        else:
+            sys.stdout.writelines(serialize(records))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import invalidate_all
+from news.excerpts import fill_excerpts
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает анонсы всех новостей пачками, например после '
+        'обновления текстов через QuerySet.update().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = fill_excerpts(News.objects.all(), options['batch_size'])
+        invalidate_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено новостей: {updated}')
+        )
@@ -0,0 +1,201 @@
+import json
+import time
+from itertools import islice
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from news.cache import invalidate_all
+from news.models import Comment, News, keep_auto_now_add
+
+MODELS = {
+    'news.news': News,
+    'news.comment': Comment,
+}
+SEPARATORS = ' \t\r\n[,]'
+# Ошибка разбора дальше этого расстояния от конца буфера не объясняется
+# обрезанным куском: самый длинный неделимый токен — \uXXXX.
+MAX_TOKEN_LENGTH = 16
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+
+def iter_json_objects(file, chunk_size=1 << 16, max_size=MAX_RECORD_SIZE):
+    """
+    Объекты из JSON-массива (формат фикстур) или JSON Lines.
+
+    Файл читается кусками, в памяти держится только незавершённый
+    хвост, поэтому размер файла не влияет на потребление памяти.
+    Синтаксическая ошибка и запись длиннее max_size символов
+    останавливают чтение, а не копятся в буфере до конца файла.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    for chunk in iter(lambda: file.read(chunk_size), ''):
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in SEPARATORS:
+                position += 1
+            if position == len(buffer):
+                break
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                # Незакрытая строка указывает на своё начало, для неё
+                # остаётся только ограничение размера записи.
+                if (
+                    not error.msg.startswith('Unterminated string')
+                    and len(buffer) - error.pos > MAX_TOKEN_LENGTH
+                ):
+                    raise CommandError(
+                        f'Некорректный JSON: {error.msg}: '
+                        f'{buffer[error.pos:error.pos + 80]!r}'
+                    )
+                # Объект ещё не дочитан — ждём следующий кусок.
+                break
+            yield obj
+        buffer = buffer[position:]
+        if len(buffer) > max_size:
+            raise CommandError(
+                f'Запись длиннее {max_size} символов: {buffer[:80]!r}'
+            )
+    if buffer.strip(SEPARATORS):
+        raise CommandError(f'Некорректный JSON в конце файла: {buffer[:80]}')
+
+
+def build_object(row):
+    """Экземпляр модели из записи фикстуры с проверкой полей."""
+    if not isinstance(row, dict):
+        raise ValidationError('Запись должна быть объектом.')
+    model = MODELS.get(row.get('model'))
+    if model is None:
+        raise ValidationError(f'Неизвестная модель {row.get("model")!r}.')
+    fields = row.get('fields', {})
+    obj = model(pk=row.get('pk'))
+    for name, value in fields.items():
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ValidationError(f'Неизвестное поле {name!r}.')
+        value = field.to_python(value)
+        if not field.is_relation:
+            field.run_validators(value)
+        setattr(obj, field.attname, value)
+    fill_missing_fields(obj, fields)
+    return obj
+
+
+def fill_missing_fields(obj, fields):
+    """Заполняет даты создания и проверяет обязательные поля."""
+    for field in obj._meta.concrete_fields:
+        if field.primary_key or field.name in fields:
+            continue
+        if getattr(field, 'auto_now_add', False):
+            setattr(obj, field.attname, timezone.now())
+        elif not field.has_default() and not field.blank:
+            raise ValidationError(f'Не заполнено поле {field.name!r}.')
+
+
+def missing_relations(model, batch):
+    """
+    Ошибки записей пачки, ссылающихся на несуществующие объекты.
+
+    SQLite проверяет внешние ключи только при COMMIT и сообщает об
+    ошибке без номера записи, поэтому ссылки проверяются заранее,
+    одним запросом на поле.
+    """
+    errors = {}
+    for field in model._meta.concrete_fields:
+        if not field.many_to_one:
+            continue
+        ids = {getattr(obj, field.attname) for _, obj in batch} - {None}
+        existing = set(
+            field.related_model._default_manager.filter(pk__in=ids)
+            .values_list('pk', flat=True)
+        )
+        for number, obj in batch:
+            value = getattr(obj, field.attname)
+            if value is not None and value not in existing:
+                errors[number] = ValidationError(
+                    f'Не найден объект {field.name!r} с id {value}.'
+                )
+    return errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает новости и комментарии из фикстуры '
+        '(JSON-массив или JSON Lines) пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--batches-per-transaction', type=int, default=10
+        )
+        parser.add_argument(
+            '--skip-invalid', action='store_true',
+            help='Пропускать некорректные записи вместо остановки.'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.loaded = self.skipped = 0
+        chunk_size = options['batch_size'] * options['batches_per_transaction']
+        started = time.monotonic()
+        with open(options['path'], encoding='utf-8') as file, \
+                keep_auto_now_add():
+            rows = enumerate(iter_json_objects(file), 1)
+            while True:
+                with transaction.atomic():
+                    if not self.load_chunk(islice(rows, chunk_size)):
+                        break
+                if self.options['verbosity'] > 1:
+                    self.stdout.write(f'Загружено: {self.loaded}')
+        invalidate_all()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено: {self.loaded}, пропущено: {self.skipped}, '
+            f'{self.loaded / max(elapsed, 1e-9):.0f} записей/с'
+        ))
+
+    def load_chunk(self, rows):
+        """Загружает записи одной транзакцией, возвращает их число."""
+        pending = {model: [] for model in MODELS.values()}
+        count = 0
+        for number, row in rows:
+            count += 1
+            try:
+                obj = build_object(row)
+            except ValidationError as error:
+                self.invalid(number, error)
+                continue
+            pending[type(obj)].append((number, obj))
+            if len(pending[type(obj)]) >= self.options['batch_size']:
+                self.flush(pending)
+        self.flush(pending)
+        return count
+
+    def invalid(self, number, error):
+        """Пропускает запись или останавливает загрузку."""
+        if not self.options['skip_invalid']:
+            raise CommandError(
+                f'Запись {number}: ' + '; '.join(error.messages)
+            )
+        self.skipped += 1
+
+    def flush(self, pending):
+        # Новости раньше комментариев: те ссылаются на них.
+        for model, batch in pending.items():
+            if not batch:
+                continue
+            errors = missing_relations(model, batch)
+            for number, error in errors.items():
+                self.invalid(number, error)
+            objs = [obj for number, obj in batch if number not in errors]
+            model.objects.bulk_create(objs)
+            self.loaded += len(objs)
+            batch.clear()
@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from news.forms import bad_words
+from news.models import Comment
+from news.moderation import find_offending, init_worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Перепроверяет видимые комментарии по текущему списку '
+        'запрещённых слов и скрывает нарушающие правила.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать нарушения, ничего не скрывая.'
+        )
+        parser.add_argument(
+            '--start-method', choices=multiprocessing.get_all_start_methods(),
+            help='Способ запуска процессов пула (по умолчанию — системный).'
+        )
+
+    def iter_batches(self, batch_size):
+        """Видимые комментарии пачками по первичному ключу."""
+        last_pk = 0
+        while True:
+            batch = list(
+                Comment.objects.filter(pk__gt=last_pk, is_hidden=False)
+                .order_by('pk')
+                .values_list('pk', 'text')[:batch_size]
+                .iterator(chunk_size=batch_size)
+            )
+            if not batch:
+                return
+            last_pk = batch[-1][0]
+            yield batch
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        scanned = hidden = 0
+        workers = max(options['workers'], 1)
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context(options['start_method']),
+            initializer=init_worker,
+            initargs=(bad_words.get_words(),),
+        ) as pool:
+            # Не больше двух пачек на процесс в работе одновременно,
+            # чтобы не читать таблицу в память целиком.
+            pending = deque()
+            for batch in self.iter_batches(options['batch_size']):
+                scanned += len(batch)
+                pending.append(pool.submit(find_offending, batch))
+                if len(pending) >= workers * 2:
+                    hidden += self.hide(pending.popleft().result(), options)
+            while pending:
+                hidden += self.hide(pending.popleft().result(), options)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено: {scanned}, скрыто: {hidden}, '
+            f'{scanned / max(elapsed, 1e-9):.0f} комментариев/с'
+        ))
+
+    def hide(self, pks, options):
+        if pks and not options['dry_run']:
+            Comment.objects.filter(pk__in=pks).hide()
+        return len(pks)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+FTS_TABLES = ('news_news_fts', 'news_comment_fts')
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовые индексы новостей и комментариев.'
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            for table in FTS_TABLES:
+                cursor.execute(
+                    f"INSERT INTO {table}({table}) VALUES ('rebuild')"
+                )
+                self.stdout.write(f'Индекс {table} перестроен.')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from news.cache import invalidate_all
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчик комментариев у всех новостей.'
+
+    def handle(self, *args, **options):
+        updated = News.objects.update_comment_count()
+        invalidate_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено новостей: {updated}')
+        )
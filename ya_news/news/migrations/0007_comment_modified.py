@@ -0,0 +1,33 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:41
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import F
+
+search = import_module('news.migrations.0006_news_search')
+# AddField и RemoveField пересоздают таблицу в SQLite вместе с её
+# триггерами, поэтому полнотекстовые индексы строятся заново.
+REBUILD_FTS = search.run_on_sqlite(search.DROP_FTS + search.CREATE_FTS)
+
+
+def fill_modified(apps, schema_editor):
+    Comment = apps.get_model('news', 'Comment')
+    Comment.objects.update(modified=F('created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_news_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, REBUILD_FTS),
+        migrations.AddField(
+            model_name='comment',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменён'),
+        ),
+        migrations.RunPython(fill_modified, migrations.RunPython.noop),
+        migrations.RunPython(REBUILD_FTS, migrations.RunPython.noop),
+    ]
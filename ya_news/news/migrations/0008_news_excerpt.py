@@ -0,0 +1,46 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:43
+from importlib import import_module
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+search = import_module('news.migrations.0006_news_search')
+# AddField и RemoveField пересоздают таблицу в SQLite вместе с её
+# триггерами, поэтому полнотекстовые индексы строятся заново.
+REBUILD_FTS = search.run_on_sqlite(search.DROP_FTS + search.CREATE_FTS)
+
+
+def fill_excerpts(apps, schema_editor):
+    # Копия news.excerpts на момент миграции: историческая миграция
+    # не должна меняться вместе с живым кодом.
+    News = apps.get_model('news', 'News')
+    last_pk = 0
+    while True:
+        batch = list(
+            News.objects.filter(pk__gt=last_pk).order_by('pk')
+            .only('pk', 'text')[:1000]
+        )
+        if not batch:
+            return
+        for news in batch:
+            news.excerpt = Truncator(news.text).words(15, truncate=' …')
+        News.objects.bulk_update(batch, ('excerpt',))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_comment_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, REBUILD_FTS),
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+        migrations.RunPython(REBUILD_FTS, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:45
+from importlib import import_module
+
+from django.db import migrations, models
+
+search = import_module('news.migrations.0006_news_search')
+# AddField и RemoveField пересоздают таблицу в SQLite вместе с её
+# триггерами, поэтому полнотекстовые индексы строятся заново.
+REBUILD_FTS = search.run_on_sqlite(search.DROP_FTS + search.CREATE_FTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_news_excerpt'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, REBUILD_FTS),
+        migrations.AddField(
+            model_name='news',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменена'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['modified'], name='news_modified_idx'),
+        ),
+        migrations.RunPython(REBUILD_FTS, migrations.RunPython.noop),
+    ]
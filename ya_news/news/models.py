@@ -1,22 +1,180 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import invalidate_news
+from .excerpts import ExcerptField
+
+
+_keep_auto_now_add = ContextVar('keep_auto_now_add', default=False)
+
+
+@contextmanager
+def keep_auto_now_add():
+    """
+    Сохраняет заданные даты создания вместо текущего времени.
+
+    Действует только в текущем потоке или задаче asyncio: метаданные
+    полей не меняются, параллельные запросы по-прежнему получают
+    текущее время.
+    """
+    token = _keep_auto_now_add.set(True)
+    try:
+        yield
+    finally:
+        _keep_auto_now_add.reset(token)
+
+
+class CreatedField(models.DateTimeField):
+    """Дата создания, которую можно задать внутри keep_auto_now_add()."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('auto_now_add', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        # Для миграций это обычный DateTimeField: отличается только
+        # поведение при сохранении.
+        name, _, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.DateTimeField', args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if add and value is not None and _keep_auto_now_add.get():
+            return value
+        return super().pre_save(model_instance, add)
+
+
+class NewsQuerySet(models.QuerySet):
+    """
+    Массовые операции с новостями.
+
+    delete и update на уровне QuerySet, например действие админки
+    «Удалить выбранные», не вызывают News.save и News.delete, поэтому
+    кеш страниц затронутых новостей сбрасывается здесь.
+    """
+
+    def delete(self):
+        news_ids = list(self.values_list('pk', flat=True))
+        result = super().delete()
+        invalidate_news(*news_ids)
+        return result
+
+    def update(self, **kwargs):
+        news_ids = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        invalidate_news(*news_ids)
+        return updated
+
+    def update_comment_count(self):
+        """Пересчитывает счётчик комментариев одним UPDATE."""
+        comments = Comment.objects.filter(
+            news=OuterRef('pk'), is_hidden=False
+        ).order_by().values('news').annotate(
+            total=Count('pk')
+        ).values('total')
+        # Кеш сбрасывает вызывающий код (news_changed), который уже
+        # знает id новостей: лишний запрос за ними не нужен.
+        return super().update(
+            comment_count=Coalesce(Subquery(comments), 0),
+            modified=timezone.now(),
+        )
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
+    # Главная страница выводит анонс и не загружает текст целиком.
+    excerpt = ExcerptField('Анонс')
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Меняется и при изменении комментариев: по нему строятся
+    # ETag и Last-Modified страниц новостей.
+    modified = models.DateTimeField('Изменена', auto_now=True)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-date',)
+        ordering = ('-date', '-id')
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+            models.Index(fields=('modified',), name='news_modified_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_news(self.pk)
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_news(pk)
+        return result
+
+
+# Поля комментария, от которых зависит счётчик комментариев новости.
+COUNTED_FIELDS = {'news', 'news_id', 'is_hidden'}
+
+
+class CommentQuerySet(models.QuerySet):
+    """
+    Массовые операции с комментариями.
+
+    Счётчик комментариев и кеш страниц затронутых новостей
+    обновляются здесь, так как bulk_create, update и delete на уровне
+    QuerySet не вызывают Comment.save и Comment.delete. Каскадное
+    удаление комментариев вместе с автором обрабатывают сигналы
+    из news.signals.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        self._news_changed({comment.news_id for comment in objs})
+        return objs
+
+    def delete(self):
+        news_ids = set(self.values_list('news_id', flat=True))
+        result = super().delete()
+        self._news_changed(news_ids)
+        return result
+
+    def update(self, **kwargs):
+        if not COUNTED_FIELDS & set(kwargs):
+            return super().update(**kwargs)
+        # Перенос в другую новость или скрытие меняют счётчики и старых,
+        # и новых новостей комментариев.
+        news_ids = set(self.values_list('news_id', flat=True))
+        updated = super().update(**kwargs)
+        for name in ('news', 'news_id'):
+            if name in kwargs:
+                news_ids.add(getattr(kwargs[name], 'pk', kwargs[name]))
+        self._news_changed(news_ids)
+        return updated
+
+    def hide(self):
+        """Скрывает комментарии, например найденные модерацией."""
+        return self.update(is_hidden=True)
+
+    def _news_changed(self, news_ids):
+        news_changed(news_ids)
+
+
+def news_changed(news_ids):
+    """Пересчитывает счётчики и сбрасывает кеш страниц новостей."""
+    News.objects.filter(pk__in=news_ids).update_comment_count()
+    invalidate_news(*news_ids)
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -28,10 +186,45 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
     )
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    created = CreatedField()
+    # Входит в ключ кеша отрисованного комментария.
+    modified = models.DateTimeField('Изменён', auto_now=True)
+    is_hidden = models.BooleanField('Скрыт модерацией', default=False)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
-        ordering = ('created',)
+        ordering = ('created', 'id')
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        news = News.objects.filter(pk=self.news_id)
+        if not adding:
+            # Комментарий могли скрыть или показать в админке.
+            news.update_comment_count()
+        elif not self.is_hidden:
+            news.update(
+                comment_count=F('comment_count') + 1,
+                modified=timezone.now(),
+            )
+        invalidate_news(self.news_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        if not self.is_hidden:
+            News.objects.filter(pk=self.news_id).update(
+                comment_count=F('comment_count') - 1,
+                modified=timezone.now(),
+            )
+        invalidate_news(self.news_id)
+        return result
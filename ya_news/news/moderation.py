@@ -0,0 +1,135 @@
+"""Поиск запрещённых слов в тексте за один проход (Aho–Corasick)."""
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+
+
+class WordMatcher:
+    """
+    Автомат Ахо–Корасик для набора слов.
+
+    Строится один раз, после чего проверка текста занимает время,
+    пропорциональное его длине, независимо от количества слов.
+    """
+
+    def __init__(self, words):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [False]
+        for word in words:
+            self._add(word.lower())
+        self._build_links()
+
+    def _add(self, word):
+        if not word:
+            return
+        state = 0
+        for char in word:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(False)
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state] = True
+
+    def _build_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                self.output[next_state] = (
+                    self.output[next_state]
+                    or self.output[self.fail[next_state]]
+                )
+
+    def search(self, text):
+        """Есть ли в тексте хотя бы одно слово из набора."""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                return True
+        return False
+
+
+def read_words(path):
+    """Слова из файла: по одному на строке, # — комментарий."""
+    with open(path, encoding='utf-8') as file:
+        return [
+            line.strip() for line in file
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+
+
+class BadWordsFilter:
+    """
+    Фильтр запрещённых слов с горячей перезагрузкой списка.
+
+    К базовым словам добавляются слова из файла settings.BAD_WORDS_FILE.
+    Автомат перестраивается, когда файл изменился на диске,
+    или по явному вызову reload().
+    """
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        self._matcher = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _file_mtime(self):
+        path = getattr(settings, 'BAD_WORDS_FILE', None)
+        if not path:
+            return None
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get_words(self):
+        """Базовые слова вместе со словами из файла."""
+        words = list(self.words)
+        if self._file_mtime() is not None:
+            words.extend(read_words(settings.BAD_WORDS_FILE))
+        return words
+
+    def reload(self):
+        with self._lock:
+            self._mtime = self._file_mtime()
+            self._matcher = WordMatcher(self.get_words())
+
+    @property
+    def matcher(self):
+        if self._matcher is None or self._file_mtime() != self._mtime:
+            self.reload()
+        return self._matcher
+
+    def contains(self, text):
+        return self.matcher.search(text)
+
+
+# Состояние процесса пула moderate_comments. Модуль не импортирует
+# модели: процессы, запущенные через spawn или forkserver, импортируют
+# его заново, и Django в них не настроен.
+_worker_matcher = None
+
+
+def init_worker(words):
+    """Строит автомат один раз на процесс пула."""
+    global _worker_matcher
+    _worker_matcher = WordMatcher(words)
+
+
+def find_offending(rows):
+    """Возвращает id комментариев с запрещёнными словами."""
+    return [pk for pk, text in rows if _worker_matcher.search(text)]
@@ -0,0 +1,74 @@
+"""Постраничный вывод по курсору (keyset pagination)."""
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+CURSOR_SEPARATOR = '|'
+
+
+def encode_cursor(value, pk):
+    """Кодирует значение поля сортировки и id в токен для ?after=."""
+    token = f'{value.isoformat()}{CURSOR_SEPARATOR}{pk}'
+    return urlsafe_base64_encode(token.encode())
+
+
+def decode_cursor(token, field, pk_field):
+    """
+    Возвращает пару (значение поля сортировки, id) из токена.
+
+    Обе части проходят через to_python() полей модели: токен приходит
+    от клиента, и подделанное значение не должно попасть в запрос.
+    """
+    try:
+        value, pk = force_str(
+            urlsafe_base64_decode(token)
+        ).rsplit(CURSOR_SEPARATOR, 1)
+        return field.to_python(value), pk_field.to_python(pk)
+    except (ValueError, TypeError, binascii.Error, ValidationError):
+        raise Http404('Некорректный курсор.')
+
+
+def after_cursor(field, value, pk, descending=False):
+    """
+    Условие для строк, идущих после курсора в порядке (field, id).
+
+    Отдельная граница field <= value (>= при возрастании) нужна индексу:
+    по одному OR SQLite просматривает индекс с начала, а с ней сразу
+    переходит к курсору.
+    """
+    lookup, bound = ('lt', 'lte') if descending else ('gt', 'gte')
+    return Q(**{f'{field}__{bound}': value}) & (
+        Q(**{f'{field}__{lookup}': value}) | Q(**{f'pk__{lookup}': pk})
+    )
+
+
+def get_keyset_page(queryset, field, per_page, after=None, descending=False):
+    """
+    Возвращает страницу и курсор следующей страницы.
+
+    Страница выбирается по индексу (field, id) без OFFSET, поэтому
+    стоимость запроса не зависит от того, насколько она далеко.
+    Выбирается на одну строку больше: по ней видно, есть ли следующая
+    страница, без отдельного запроса.
+    """
+    if after:
+        opts = queryset.model._meta
+        queryset = queryset.filter(after_cursor(
+            field,
+            *decode_cursor(after, opts.get_field(field), opts.pk),
+            descending
+        ))
+    rows = list(queryset[:per_page + 1])
+    page = queryset[:per_page]
+    # Страница остаётся QuerySet, но уже заполнена выбранными строками
+    # и повторно в базу не обращается.
+    page._result_cache = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = rows[per_page - 1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return page, next_cursor
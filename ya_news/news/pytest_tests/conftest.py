@@ -1,11 +1,49 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from yacommon.snapshot import setup_test_database
 
 from news.models import News, Comment
+from news.pytest_tests.factories import make_comments, make_news
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(
+    request, django_test_environment, django_db_blocker,
+    django_db_keepdb, django_db_createdb
+):
+    """Тестовая база из снимка; --create-db пересобирает снимок."""
+    with django_db_blocker.unblock():
+        teardown = setup_test_database(
+            rebuild=django_db_createdb, keepdb=django_db_keepdb
+        )
+    yield
+    with django_db_blocker.unblock():
+        teardown()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    caches['fragments'].clear()
+
+
+@pytest.fixture
+def count_queries():
+    """Считает SQL-запросы, которых стоит GET-запрос клиента к url."""
+    def count(client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return len(context)
+    return count
 
 
 @pytest.fixture
@@ -59,24 +97,12 @@ def comment(news, author):
 
 @pytest.fixture
 def many_news():
-    today = datetime.today()
-    all_news = [
-        News(
-            title=f'Новость {index}',
-            text='Просто текст.',
-            date=today - timedelta(days=index)
-        )
-        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
-    ]
-    News.objects.bulk_create(all_news)
+    return make_news(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
 
 
 @pytest.fixture
 def comments(news, author):
-    for index in range(10):
-        Comment.objects.create(
-            news=news, author=author, text=f'Tекст {index}',
-        )
+    return make_comments([news], [author], 10)
 
 
 @pytest.fixture
@@ -89,11 +115,26 @@ def home_url():
     return reverse('news:home')
 
 
+@pytest.fixture
+def search_url():
+    return reverse('news:search')
+
+
+@pytest.fixture
+def export_url():
+    return reverse('news:export')
+
+
 @pytest.fixture
 def detail_url(news):
     return reverse('news:detail', args=(news.id,))
 
 
+@pytest.fixture
+def comments_url(news):
+    return reverse('news:comments', args=(news.id,))
+
+
 @pytest.fixture
 def delete_url(comment):
     return reverse('news:delete', args=(comment.id,))
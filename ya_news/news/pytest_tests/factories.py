@@ -0,0 +1,50 @@
+"""
+Новости и комментарии для тестов.
+
+Общие помощники — bulk_create с заранее назначенными pk, make_text,
+make_users — находятся в yacommon.factories.
+"""
+import random
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from yacommon.factories import bulk_create, make_text
+
+from news.models import Comment, News, keep_auto_now_add
+
+WORDS = (
+    'город', 'погода', 'спорт', 'наука', 'театр',
+    'культура', 'экономика', 'транспорт', 'выставка', 'концерт',
+)
+
+
+def make_news(count, seed=0, start=None):
+    """Новости по одной на день, начиная с start и дальше в прошлое."""
+    rnd = random.Random(seed)
+    start = start or datetime.today()
+    return bulk_create(News, [
+        News(
+            title=f'Новость {index}',
+            text=make_text(rnd, 30, WORDS),
+            date=start - timedelta(days=index),
+        )
+        for index in range(count)
+    ])
+
+
+def make_comments(news, authors, per_news, seed=0, start=None):
+    """Комментарии к каждой новости с интервалом в минуту."""
+    rnd = random.Random(seed)
+    start = start or timezone.now()
+    comments = [
+        Comment(
+            news=item,
+            author=rnd.choice(authors),
+            text=make_text(rnd, 10, WORDS),
+            created=start + timedelta(minutes=index),
+        )
+        for item in news
+        for index in range(per_news)
+    ]
+    with keep_auto_now_add():
+        return bulk_create(Comment, comments)
@@ -1,10 +1,28 @@
+import csv
+import json
+from http import HTTPStatus
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.conf import settings
-from django.urls import reverse
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils.http import urlsafe_base64_encode
+from django.utils.text import Truncator
+from yacommon.stats import QueryTimer, request_stats
 
 from news.forms import CommentForm
+from news import search, views
+from news.models import Comment, News
 
 HOME_URL = reverse('news:home')
+SEARCH_URL = reverse('news:search')
 pytestmark = pytest.mark.django_db
 
 
@@ -25,6 +43,94 @@ def test_news_order(client, many_news):
     assert all_dates == sorted_dates
 
 
+def test_home_page_uses_excerpts(client, news):
+    """Тест - главная выводит анонс и не загружает полный текст."""
+    news.text = ' '.join(f'слово{index}' for index in range(30))
+    news.save()
+    with CaptureQueriesContext(connection) as context:
+        content = client.get(HOME_URL).content.decode()
+    assert news.excerpt == Truncator(news.text).words(15, truncate=' …')
+    assert news.excerpt in content
+    assert 'слово20' not in content
+    assert not any(
+        '"news_news"."text"' in query['sql'] for query in context
+    )
+
+
+def test_news_next_page(client, many_news):
+    """Тест - по курсору ?after= выводятся более ранние новости."""
+    response = client.get(HOME_URL)
+    first_page = list(response.context['object_list'])
+    next_cursor = response.context['next_cursor']
+    assert next_cursor is not None
+    response = client.get(HOME_URL, {'after': next_cursor})
+    next_page = list(response.context['object_list'])
+    assert len(next_page) == 1
+    assert next_page[0].date < first_page[-1].date
+    assert response.context['next_cursor'] is None
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    (
+        'не-курсор',
+        urlsafe_base64_encode(b'abc|1'),
+        urlsafe_base64_encode(b'2020-01-01|abc'),
+    )
+)
+def test_news_invalid_cursor(client, cursor):
+    """Тест - некорректный или подделанный курсор приводит к 404."""
+    response = client.get(HOME_URL, {'after': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' '.join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='План запроса SQLite.'
+)
+@pytest.mark.parametrize(
+    'url, table, field',
+    (
+        (HOME_URL, 'news_news', 'date'),
+        (pytest.lazy_fixture('comments_url'), 'news_comment', 'created'),
+    )
+)
+def test_cursor_page_seeks_index(
+        client, news, comments, many_news, url, table, field, settings
+):
+    """Тест - страница после курсора ищется по индексу, а не сканом."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 4
+    cursor = client.get(HOME_URL).context['next_cursor']
+    if table == 'news_comment':
+        first = news.comment_set.all()[0]
+        cursor = urlsafe_base64_encode(
+            f'{first.created.isoformat()}|{first.pk}'.encode()
+        )
+    queries = []
+
+    def capture(execute, sql, params, many, context):
+        queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    # План строится по запросу с параметрами, как его выполняет Django:
+    # с подставленными значениями SQLite оптимизирует иначе.
+    with connection.execute_wrapper(capture):
+        response = client.get(url, {'after': cursor})
+    assert response.status_code == HTTPStatus.OK
+    sql, params = next(
+        (sql, params) for sql, params in queries
+        if f'FROM "{table}"' in sql and 'LIMIT' in sql
+    )
+    plan = explain(sql, params)
+    assert f'SEARCH {table}' in plan
+    assert f'{field}<' in plan or f'{field}>' in plan
+
+
 def test_comments_order(client, news, comments, detail_url):
     """Тест - проверка сортировки комментариев."""
     response = client.get(detail_url)
@@ -36,6 +142,205 @@ def test_comments_order(client, news, comments, detail_url):
     assert all_timestamps == sorted_timestamps
 
 
+def test_comments_next_page(
+        client, news, comments, detail_url, comments_url, settings
+):
+    """Тест - следующие комментарии подгружаются по курсору."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 4
+    response = client.get(detail_url)
+    shown = list(response.context['comments'])
+    assert len(shown) == 4
+    while response.context['next_cursor']:
+        response = client.get(
+            comments_url, {'after': response.context['next_cursor']}
+        )
+        shown.extend(response.context['comments'])
+    assert shown == list(news.comment_set.all())
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    (
+        'не-курсор',
+        urlsafe_base64_encode(b'abc|1'),
+    )
+)
+def test_comments_invalid_cursor(client, comments_url, cursor):
+    """Тест - подделанный курсор комментариев приводит к 404."""
+    response = client.get(comments_url, {'after': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_anonymous_pages_are_cached(client, news, author, detail_url):
+    """
+    Тест - страницы для анонимов берутся из кеша
+    и обновляются после изменения комментариев.
+    """
+    for url in (HOME_URL, detail_url):
+        assert client.get(url).context is not None
+        assert client.get(url).context is None
+    comment = Comment.objects.create(news=news, author=author, text='Новый')
+    response = client.get(HOME_URL)
+    assert response.context is not None
+    assert 'Комментариев: 1' in response.content.decode()
+    response = client.get(detail_url)
+    assert response.context is not None
+    assert comment.text in response.content.decode()
+
+
+@pytest.mark.parametrize(
+    'change',
+    (
+        lambda news: News.objects.filter(pk=news.pk).delete(),
+        lambda news: News.objects.filter(pk=news.pk).update(
+            title='Новый заголовок'
+        ),
+    )
+)
+def test_home_cache_after_bulk_change(client, news, change):
+    """Тест - массовые delete и update новостей сбрасывают кеш главной."""
+    assert news.title in client.get(HOME_URL).content.decode()
+    change(news)
+    response = client.get(HOME_URL)
+    assert response.context is not None
+    assert news.title not in response.content.decode()
+
+
+def test_page_cache_ignores_unknown_params(client, news):
+    """Тест - посторонние параметры запроса не создают копий страницы."""
+    client.get(HOME_URL)
+    for value in range(3):
+        assert client.get(HOME_URL, {'x': value}).context is None
+
+
+def test_comment_fragment_cache(
+    author_client, not_author_client, comment, detail_url
+):
+    """
+    Тест - отрисованный комментарий берётся из кеша, а ссылки
+    редактирования видит только автор.
+    """
+    edit_url = reverse('news:edit', args=(comment.pk,))
+    assert edit_url in author_client.get(detail_url).content.decode()
+    key = make_template_fragment_key(
+        'news_comment',
+        (comment.pk, comment.modified, comment.author.username)
+    )
+    assert caches['fragments'].get(key) is not None
+    assert edit_url not in not_author_client.get(detail_url).content.decode()
+    comment.text = 'Изменённый текст'
+    comment.save()
+    content = author_client.get(detail_url).content.decode()
+    assert comment.text in content
+    assert edit_url in content
+
+
+@pytest.mark.parametrize(
+    'query, found',
+    (
+        ('новость', True),
+        ('ПРОСТО тек', True),
+        ('комментария', True),
+        ('скрытый', False),
+        ('"*)(', False),
+        ('отсутствует', False),
+    )
+)
+def test_search(client, news, comment, query, found):
+    """Тест - поиск по новостям и видимым комментариям."""
+    Comment.objects.create(
+        news=news, author=comment.author, text='Скрытый', is_hidden=True
+    )
+    response = client.get(SEARCH_URL, {'q': query})
+    assert list(response.context['object_list']) == ([news] if found else [])
+
+
+@pytest.mark.parametrize('vendor', ('sqlite', 'postgresql'))
+@pytest.mark.parametrize('query', ('', '   ', '"*)('))
+def test_search_without_words(monkeypatch, news, vendor, query):
+    """Тест - запрос без слов ничего не находит на любой СУБД."""
+    monkeypatch.setattr(search.connection, 'vendor', vendor)
+    assert search.search_news(query).count() == 0
+
+
+def test_search_ranking_and_pages(client, many_news, settings):
+    """Тест - результаты поиска упорядочены и разбиты на страницы."""
+    response = client.get(SEARCH_URL, {'q': 'новость'})
+    assert response.context['paginator'].count == (
+        settings.NEWS_COUNT_ON_HOME_PAGE + 1
+    )
+    assert len(response.context['object_list']) == (
+        settings.NEWS_COUNT_ON_HOME_PAGE
+    )
+    news = News.objects.last()
+    news.title = 'Новость новость'
+    news.save()
+    response = client.get(SEARCH_URL, {'q': 'новость'})
+    assert response.context['object_list'][0] == news
+
+
+def test_export(admin_client, news, comment, export_url):
+    """Тест - выгрузка новостей с комментариями в JSON Lines и CSV."""
+    other_news = News.objects.create(title='Другая', text='Без комментариев')
+    response = admin_client.get(export_url)
+    rows = [
+        json.loads(line)
+        for line in b''.join(response.streaming_content).decode().splitlines()
+    ]
+    assert [(row['model'], row['pk']) for row in rows] == [
+        ('news.news', news.pk),
+        ('news.comment', comment.pk),
+        ('news.news', other_news.pk),
+    ]
+    assert rows[1]['fields']['text'] == comment.text
+    response = admin_client.get(export_url, {'format': 'csv'})
+    rows = list(csv.reader(
+        b''.join(response.streaming_content).decode().splitlines()
+    ))
+    assert rows[0][0] == 'model'
+    assert rows[2][5] == comment.author.username
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_under_asgi(admin_client, news, comment, export_url):
+    """Тест - выгрузка работает под ASGI-сервером."""
+    messages = []
+    cookie = '; '.join(
+        f'{name}={morsel.value}'
+        for name, morsel in admin_client.cookies.items()
+    )
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': export_url,
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    async_to_sync(ASGIHandler())(scope, receive, send)
+    assert messages[0]['status'] == HTTPStatus.OK
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    assert [
+        json.loads(line)['pk'] for line in body.decode().splitlines()
+    ] == [news.pk, comment.pk]
+
+
+def test_request_stats(admin_client, news, detail_url, settings):
+    """Тест - замеры запросов в Server-Timing и в сводке по URL."""
+    settings.REQUEST_STATS_ENABLED = True
+    request_stats.clear()
+    response = Client().get(detail_url)
+    assert 'db;dur=' in response['Server-Timing']
+    assert 'render;dur=' in response['Server-Timing']
+    stats = admin_client.get(reverse('request_stats')).json()
+    assert stats['news:detail']['count'] == 1
+    assert set(stats['news:detail']['queries']) == {'p50', 'p95', 'p99'}
+
+
 def test_anonymous_client_has_no_form(client, detail_url):
     """
     Тест - анонимному пользователю недоступна форма
@@ -53,3 +358,48 @@ def test_authorized_client_has_form(author_client, detail_url):
     response = author_client.get(detail_url)
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_news_views(rf, many_news):
+    """Тест - асинхронные представления отдают список и новость."""
+    news = many_news[0]
+    detail_url = reverse('news:detail', args=(news.pk,))
+    for view, url, kwargs in (
+        (views.news_list, HOME_URL, {}),
+        (views.news_detail, detail_url, {'pk': news.pk}),
+    ):
+        request = rf.get(url)
+        request.user = AnonymousUser()
+        request.query_timer = QueryTimer()
+        response = async_to_sync(view)(request, **kwargs)
+        assert response.status_code == HTTPStatus.OK
+        assert news.title in response.content.decode()
+        # Запросы из пула потоков тоже попадают в статистику.
+        assert request.query_timer.queries > 0
+
+
+def test_async_comment_post_in_main_thread(rf, news, author, detail_url):
+    """
+    Тест - комментарий через асинхронное представление пишется
+    в общем потоке, внутри транзакции теста.
+    """
+    request = rf.post(detail_url, {'text': 'Новый комментарий'})
+    request.user = author
+    response = async_to_sync(views.news_detail)(request, pk=news.pk)
+    assert response.status_code == HTTPStatus.FOUND
+    assert news.comment_set.get().text == 'Новый комментарий'
+
+
+def test_asgi_urlconf():
+    """Тест - под ASGI список и новость асинхронные, под WSGI — нет."""
+    from yanews.asgi import application
+
+    assert application.urlconf == 'yanews.asgi_urls'
+    asgi_match = resolve(HOME_URL, urlconf=application.urlconf)
+    assert asgi_match.func is views.news_list
+    assert asgi_match.view_name == 'news:home'
+    assert resolve(HOME_URL).func is not views.news_list
+    assert resolve('/auth/login/', urlconf=application.urlconf).url_name == (
+        'login'
+    )
@@ -1,10 +1,19 @@
+import io
+import json
 from http import HTTPStatus
 
 import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
 from pytest_django.asserts import assertRedirects, assertFormError
+from yacommon.factories import PASSWORD, make_users
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.forms import BAD_WORDS, WARNING, bad_words
+from news.management.commands.import_news import iter_json_objects
+from news.models import Comment, News
+from news.moderation import WordMatcher
+from news.pytest_tests.factories import make_comments, make_news
+from news.writer import WRITE_TIMEOUT_ERROR, CommentWriter, comment_writer
 
 pytestmark = pytest.mark.django_db
 
@@ -30,6 +39,65 @@ def test_user_can_create_comment(
     assert comment.text == form_data['text']
     assert comment.news == news
     assert comment.author == not_author
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_write_queue(
+    not_author_client, form_data, detail_url, news, settings
+):
+    """Тест - комментарий из очереди виден автору сразу после отправки."""
+    settings.NEWS_COMMENT_WRITE_QUEUE = True
+    response = not_author_client.post(detail_url, data=form_data)
+    assertRedirects(response, f'{detail_url}#comments')
+    response = not_author_client.get(detail_url)
+    assert form_data['text'] in response.content.decode()
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_writer_batches(news, author, settings):
+    """Тест - комментарии из очереди сохраняются одной пачкой."""
+    settings.NEWS_COMMENT_WRITE_DELAY = 0.2
+    writer = CommentWriter()
+    batches = []
+    flush = writer.flush
+
+    def count_batches(batch):
+        batches.append(len(batch))
+        flush(batch)
+
+    writer.flush = count_batches
+    futures = [
+        writer.submit(Comment(news=news, author=author, text=f'Текст {index}'))
+        for index in range(5)
+    ]
+    for future in futures:
+        future.result(timeout=5)
+    assert batches == [5]
+    assert Comment.objects.count() == 5
+    saved = Comment.objects.in_bulk()
+    for future in futures:
+        comment = future.result()
+        assert saved[comment.pk].text == comment.text
+
+
+def test_comment_writer_timeout(
+        not_author_client, detail_url, form_data, settings, monkeypatch
+):
+    """Тест - комментарий, не записанный за таймаут, снимается с очереди."""
+    settings.NEWS_COMMENT_WRITE_QUEUE = True
+    settings.NEWS_COMMENT_WRITE_TIMEOUT = 0.01
+    writer = CommentWriter()
+    monkeypatch.setattr(writer, 'start', lambda: None)
+    monkeypatch.setattr(comment_writer, 'save', writer.save)
+    response = not_author_client.post(detail_url, data=form_data)
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assertFormError(response, 'form', None, WRITE_TIMEOUT_ERROR)
+    assert writer.collect() == []
+    assert Comment.objects.count() == 0
 
 
 def test_user_cant_use_bad_words(not_author_client, detail_url,):
@@ -47,8 +115,141 @@ def test_user_cant_use_bad_words(not_author_client, detail_url,):
     assert comments_count_now == comments_count
 
 
+@pytest.mark.parametrize(
+    'text, expected',
+    (
+        ('ushers', True),
+        ('Прохожий', False),
+        ('HIS', True),
+        ('', False),
+    )
+)
+def test_word_matcher(text, expected):
+    """Тест - автомат находит слова, в том числе пересекающиеся."""
+    matcher = WordMatcher(('he', 'she', 'his', 'hers'))
+    assert matcher.search(text) is expected
+
+
+def test_bad_words_file_reload(
+        not_author_client, detail_url, settings, tmp_path
+):
+    """Тест - список запрещённых слов подгружается из файла."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# Список слов\nзлодей\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    try:
+        assert bad_words.contains('Какой злодей!')
+        assert bad_words.contains(BAD_WORDS[0])
+        words_file.write_text('разбойник\n', encoding='utf-8')
+        bad_words.reload()
+        assert not bad_words.contains('Какой злодей!')
+        response = not_author_client.post(
+            detail_url, data={'text': 'Разбойник!'}
+        )
+        assertFormError(response, form='form', field='text', errors=WARNING)
+    finally:
+        settings.BAD_WORDS_FILE = None
+        bad_words.reload()
+
+
+@pytest.mark.parametrize('start_method', (None, 'spawn'))
+def test_moderate_comments_hides_bad_words(
+        news, author, client, detail_url, start_method
+):
+    """Тест - пересканирование скрывает комментарии с ругательствами."""
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=text)
+        for text in ('Хороший', f'Ну ты {BAD_WORDS[1]}', 'Отличный')
+    )
+    call_command(
+        'moderate_comments', batch_size=2, workers=2,
+        start_method=start_method
+    )
+    assert list(
+        Comment.objects.filter(is_hidden=True).values_list('text', flat=True)
+    ) == [f'Ну ты {BAD_WORDS[1]}']
+    news.refresh_from_db()
+    assert news.comment_count == 2
+    response = client.get(detail_url)
+    assert BAD_WORDS[1] not in response.content.decode()
+
+
+def test_import_news_fixture():
+    """Тест - потоковая загрузка фикстуры news.json."""
+    call_command('import_news', 'news/fixtures/news.json', batch_size=5)
+    assert News.objects.count() == 19
+
+
+def test_import_news_jsonl(tmp_path, author):
+    """
+    Тест - загрузка JSON Lines с комментариями:
+    даты сохраняются, некорректные записи пропускаются.
+    """
+    rows = (
+        {'model': 'news.news', 'pk': 7, 'fields': {
+            'title': 'Новость', 'text': 'Текст', 'date': '2022-11-01'
+        }},
+        {'model': 'news.comment', 'fields': {
+            'news': 7, 'author': author.pk, 'text': 'Первый',
+            'created': '2022-11-02T10:00:00+00:00'
+        }},
+        {'model': 'news.news', 'fields': {'title': 'Без текста'}},
+        {'model': 'news.news', 'fields': {'title': 'x' * 51, 'text': '.'}},
+        {'model': 'news.comment', 'fields': {
+            'news': 999, 'author': author.pk, 'text': 'Без новости'
+        }},
+    )
+    path = tmp_path / 'news.jsonl'
+    path.write_text(
+        '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows),
+        encoding='utf-8'
+    )
+    with pytest.raises(CommandError):
+        call_command('import_news', str(path))
+    assert not News.objects.exists()
+    call_command('import_news', str(path), skip_invalid=True)
+    news = News.objects.get()
+    assert news.comment_count == 1
+    comment = news.comment_set.get()
+    assert comment.created.isoformat() == '2022-11-02T10:00:00+00:00'
+    assert Comment.objects.count() == 1
+
+
+def test_import_news_missing_relation(tmp_path, author):
+    """Тест - ссылка на несуществующую новость — ошибка записи."""
+    path = tmp_path / 'news.jsonl'
+    path.write_text(json.dumps({'model': 'news.comment', 'fields': {
+        'news': 999, 'author': author.pk, 'text': 'Текст'
+    }}), encoding='utf-8')
+    with pytest.raises(CommandError, match='Запись 1'):
+        call_command('import_news', str(path))
+
+
+def test_iter_json_objects_chunks():
+    """Тест - объекты, разрезанные между кусками, читаются целиком."""
+    rows = [
+        {'a': True, 'b': None, 'c': -1.5e3, 'd': 'Ж\n"'},
+        {'e': False, 'f': [1, 2]},
+    ]
+    file = io.StringIO(json.dumps(rows))
+    assert list(iter_json_objects(file, chunk_size=1)) == rows
+
+
+def test_iter_json_objects_stops_on_error():
+    """Тест - ошибка в середине файла не читает его до конца."""
+    file = io.StringIO('{"a": 1}\n{"b": ]}\n' + '{"c": 1}\n' * 10000)
+    with pytest.raises(CommandError, match='Некорректный JSON'):
+        list(iter_json_objects(file, chunk_size=64))
+    assert file.tell() < 1000
+    file = io.StringIO('{"a": "' + 'x' * 10000)
+    with pytest.raises(CommandError, match='Запись длиннее'):
+        list(iter_json_objects(file, chunk_size=64, max_size=1000))
+    assert file.tell() < 2000
+
+
 def test_author_can_delete_comment(
         author_client,
+        news,
         comment,
         detail_url,
         delete_url
@@ -59,6 +260,36 @@ def test_author_can_delete_comment(
     assertRedirects(response, detail_url + '#comments')
     comments_count_now = Comment.objects.count()
     assert comments_count - 1 == comments_count_now
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_comment_count_after_bulk_operations(news, author):
+    """Тест - счётчик комментариев учитывает массовые операции."""
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(5)
+    )
+    news.refresh_from_db()
+    assert news.comment_count == 5
+    Comment.objects.filter(text__in=('Текст 0', 'Текст 1')).delete()
+    news.refresh_from_db()
+    assert news.comment_count == 3
+
+
+def test_comment_count_after_author_delete(news, author, not_author):
+    """Тест - счётчик учитывает каскадное удаление и перенос."""
+    other_news = News.objects.create(title='Другая', text='Текст')
+    Comment.objects.create(news=news, author=author, text='Текст')
+    Comment.objects.create(news=news, author=not_author, text='Текст')
+    Comment.objects.create(news=news, author=not_author, text='Текст')
+    author.delete()
+    news.refresh_from_db()
+    assert news.comment_count == 2
+    Comment.objects.filter(author=not_author).update(news=other_news)
+    news.refresh_from_db()
+    other_news.refresh_from_db()
+    assert (news.comment_count, other_news.comment_count) == (0, 2)
 
 
 def test_user_cant_delete_comment_of_another_user(
@@ -113,3 +344,38 @@ def test_user_cant_edit_comment_of_another_user(
     assert comment.text == comment_text
     assert comment.author == author
     assert comment.news == news
+
+
+def test_factories_create_rows_in_bulk():
+    """Тест - фабрики создают объекты с pk и одинаковыми данными."""
+    users = make_users(3)
+    all_news = make_news(20, seed=1)
+    comments = make_comments(all_news, users, 5, seed=1)
+    assert News.objects.count() == 20
+    assert Comment.objects.count() == 100
+    assert all(comment.pk for comment in comments)
+    assert users[0].check_password(PASSWORD)
+    assert News.objects.get(pk=all_news[0].pk).comment_count == 5
+    assert make_news(1, seed=1)[0].text == all_news[0].text
+
+
+def test_sqlite_connection_tuning(settings):
+    """Тест - к соединению с SQLite применены настройки из SQLITE_PRAGMAS."""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+    # 1 — NORMAL, 2 — FULL, значение SQLite по умолчанию.
+    assert synchronous == (1 if settings.SQLITE_PRAGMAS else 2)
+
+
+def test_fill_excerpts_command():
+    """Тест - команда пересчитывает анонсы после массового обновления."""
+    make_news(5)
+    News.objects.update(text='Обновлённый текст')
+    modified = dict(News.objects.values_list('pk', 'modified'))
+    call_command('fill_excerpts', batch_size=2)
+    assert set(News.objects.values_list('excerpt', flat=True)) == {
+        'Обновлённый текст'
+    }
+    for pk, value in News.objects.values_list('pk', 'modified'):
+        assert value > modified[pk]
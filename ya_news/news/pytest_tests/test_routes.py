@@ -1,17 +1,29 @@
 from http import HTTPStatus
 
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 from pytest_django.asserts import assertRedirects
+from yacommon.factories import PASSWORD, make_users
+
+from news.models import Comment, News
+from news.pytest_tests.factories import make_comments, make_news
 
 pytestmark = pytest.mark.django_db
 ANONYMOUS_CLIENT = (pytest.lazy_fixture('anonymous_client'))
 AUTHOR_CLIENT = (pytest.lazy_fixture('author_client'))
 NOT_AUTHOR_CLIENT = (pytest.lazy_fixture('not_author_client'))
+ADMIN_CLIENT = (pytest.lazy_fixture('admin_client'))
 HOME_URL = (pytest.lazy_fixture('home_url'))
+SEARCH_URL = (pytest.lazy_fixture('search_url'))
+EXPORT_URL = (pytest.lazy_fixture('export_url'))
 LOGIN_URL = (pytest.lazy_fixture('login_url'))
 LOGOUT_URL = (pytest.lazy_fixture('logout_url'))
 SIGNUP_URL = (pytest.lazy_fixture('signup_url'))
 DETAIL_URL = (pytest.lazy_fixture('detail_url'))
+COMMENTS_URL = (pytest.lazy_fixture('comments_url'))
 EDIT_URL = (pytest.lazy_fixture('edit_url'))
 DELETE_URL = (pytest.lazy_fixture('delete_url'))
 
@@ -20,7 +32,9 @@ DELETE_URL = (pytest.lazy_fixture('delete_url'))
     'url, parametrized_client, expected_status',
     (
         (HOME_URL, ANONYMOUS_CLIENT, HTTPStatus.OK),
+        (SEARCH_URL, ANONYMOUS_CLIENT, HTTPStatus.OK),
         (DETAIL_URL, ANONYMOUS_CLIENT, HTTPStatus.OK),
+        (COMMENTS_URL, ANONYMOUS_CLIENT, HTTPStatus.OK),
         (LOGIN_URL, ANONYMOUS_CLIENT, HTTPStatus.OK),
         (LOGOUT_URL, ANONYMOUS_CLIENT, HTTPStatus.OK),
         (SIGNUP_URL, ANONYMOUS_CLIENT, HTTPStatus.OK),
@@ -28,6 +42,8 @@ DELETE_URL = (pytest.lazy_fixture('delete_url'))
         (DELETE_URL, AUTHOR_CLIENT, HTTPStatus.OK),
         (EDIT_URL, NOT_AUTHOR_CLIENT, HTTPStatus.NOT_FOUND),
         (DELETE_URL, NOT_AUTHOR_CLIENT, HTTPStatus.NOT_FOUND),
+        (EXPORT_URL, AUTHOR_CLIENT, HTTPStatus.FORBIDDEN),
+        (EXPORT_URL, ADMIN_CLIENT, HTTPStatus.OK),
     )
 )
 def test_pages_availability_for_different_user(
@@ -43,6 +59,7 @@ def test_pages_availability_for_different_user(
     (
         (EDIT_URL),
         (DELETE_URL),
+        (EXPORT_URL),
     )
 )
 def test_redirect_for_anonymous_client(client, url, login_url):
@@ -50,3 +67,166 @@ def test_redirect_for_anonymous_client(client, url, login_url):
     redirect_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, redirect_url)
+
+
+@pytest.mark.parametrize(
+    'url',
+    (
+        (HOME_URL),
+        (DETAIL_URL),
+        (COMMENTS_URL),
+    )
+)
+def test_conditional_get(client, url, home_url, news, author):
+    """Тест - неизменившаяся страница отдаётся ответом 304."""
+    response = client.get(url)
+    etag = response['ETag']
+    headers = [{'HTTP_IF_NONE_MATCH': etag}]
+    if url != home_url:
+        headers.append({'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']})
+    for header in headers:
+        response = client.get(url, **header)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+    Comment.objects.create(news=news, author=author, text='Новый')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_conditional_get_after_delete(client, home_url, many_news):
+    """Тест - удаление не последней новости меняет ETag главной."""
+    response = client.get(home_url)
+    assert not response.has_header('Last-Modified')
+    etag = response['ETag']
+    News.objects.order_by('modified').first().delete()
+    response = client.get(home_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_home_conditional_get_without_queries(client, home_url, news):
+    """Тест - ETag главной проверяется без запросов к базе."""
+    etag = client.get(home_url)['ETag']
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(home_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert len(context) == 0
+
+
+def test_conditional_get_after_login(client, detail_url, login_url):
+    """Тест - после нового входа страница с CSRF-токеном не отдаётся 304."""
+    user, = make_users(1)
+    credentials = {'username': user.username, 'password': PASSWORD}
+    client.post(login_url, credentials)
+    etag = client.get(detail_url)['ETag']
+    client.logout()
+    client.post(login_url, credentials)
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_conditional_get_for_user(client, author_client, detail_url):
+    """Тест - ETag пользователя свой, Last-Modified ему не отдаётся."""
+    etag = client.get(detail_url)['ETag']
+    response = author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+    assert not response.has_header('Last-Modified')
+
+
+@pytest.mark.parametrize(
+    'url, parametrized_client, budget',
+    (
+        (HOME_URL, ANONYMOUS_CLIENT, 2),
+        (SEARCH_URL, ANONYMOUS_CLIENT, 3),
+        (DETAIL_URL, ANONYMOUS_CLIENT, 2),
+        (COMMENTS_URL, ANONYMOUS_CLIENT, 2),
+        (LOGIN_URL, ANONYMOUS_CLIENT, 0),
+        (LOGOUT_URL, ANONYMOUS_CLIENT, 0),
+        (SIGNUP_URL, ANONYMOUS_CLIENT, 0),
+        (HOME_URL, AUTHOR_CLIENT, 4),
+        (DETAIL_URL, AUTHOR_CLIENT, 4),
+        (COMMENTS_URL, AUTHOR_CLIENT, 4),
+        (EDIT_URL, AUTHOR_CLIENT, 4),
+        (DELETE_URL, AUTHOR_CLIENT, 4),
+        (EDIT_URL, NOT_AUTHOR_CLIENT, 3),
+        (DELETE_URL, NOT_AUTHOR_CLIENT, 3),
+        (EXPORT_URL, AUTHOR_CLIENT, 2),
+        (EXPORT_URL, ADMIN_CLIENT, 4),
+    )
+)
+def test_pages_query_budget(
+        url, parametrized_client, budget, comment, count_queries
+):
+    """Тест - страницы укладываются в бюджет SQL-запросов."""
+    assert count_queries(parametrized_client, url) <= budget
+
+
+@pytest.mark.parametrize(
+    'url',
+    (
+        (HOME_URL),
+        (DETAIL_URL),
+        (COMMENTS_URL),
+        (EXPORT_URL),
+    )
+)
+@pytest.mark.parametrize(
+    'parametrized_client',
+    (
+        (ANONYMOUS_CLIENT),
+        (ADMIN_CLIENT),
+    )
+)
+def test_queries_do_not_grow_with_data(
+        url, parametrized_client, news, comment, count_queries
+):
+    """Тест - число запросов не зависит от числа комментариев."""
+    queries = count_queries(parametrized_client, url)
+    make_news(1000)
+    make_comments([news], make_users(100), 1000)
+    cache.clear()
+    assert count_queries(parametrized_client, url) == queries
+
+
+def test_user_is_cached(
+        settings, tmp_path, author_client, author, detail_url, count_queries
+):
+    """Тест - пользователь запроса берётся из общего кеша до изменения."""
+    settings.CACHES = {**settings.CACHES, 'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tmp_path,
+    }}
+    queries = count_queries(author_client, detail_url)
+    assert count_queries(author_client, detail_url) == queries - 1
+    author.first_name = 'Имя'
+    author.save()
+    assert count_queries(author_client, detail_url) == queries
+
+
+def test_user_is_not_cached_in_locmem(
+        author_client, detail_url, count_queries
+):
+    """Тест - в кеше одного процесса пользователь не хранится."""
+    queries = count_queries(author_client, detail_url)
+    assert count_queries(author_client, detail_url) == queries
+
+
+def test_session_with_model_backend(author, edit_url):
+    """Тест - сессия, созданная с ModelBackend, остаётся действительной."""
+    client = Client()
+    client.force_login(
+        author, backend='django.contrib.auth.backends.ModelBackend'
+    )
+    assert client.get(edit_url).status_code == HTTPStatus.OK
+
+
+def test_signed_cookie_session(settings, author, detail_url, count_queries):
+    """Тест - сессия в подписанной cookie не читается из базы."""
+    queries = {}
+    for backend in ('db', 'signed_cookies'):
+        settings.SESSION_ENGINE = settings.SESSION_ENGINES[backend]
+        client = Client()
+        client.force_login(author)
+        client.get(detail_url)
+        queries[backend] = count_queries(client, detail_url)
+    assert queries['signed_cookies'] == queries['db'] - 1
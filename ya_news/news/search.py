@@ -0,0 +1,74 @@
+"""Полнотекстовый поиск по новостям и комментариям (SQLite FTS5)."""
+from django.db import connection
+from django.db.models import Q
+from yacommon.search import build_match_query
+
+from .models import News
+
+# Совпадения в новости весят больше, чем в комментариях к ней.
+# bm25() в FTS5 возвращает отрицательные числа: чем меньше, тем лучше.
+RANKED_NEWS_SQL = """
+    SELECT news_id, MIN(score) AS rank FROM (
+        SELECT rowid AS news_id, bm25(news_news_fts, 2.0, 1.0) AS score
+        FROM news_news_fts WHERE news_news_fts MATCH %s
+        UNION ALL
+        SELECT comment.news_id, bm25(news_comment_fts) * 0.5 AS score
+        FROM news_comment_fts
+        JOIN news_comment AS comment ON comment.id = news_comment_fts.rowid
+        WHERE news_comment_fts MATCH %s AND NOT comment.is_hidden
+    ) GROUP BY news_id
+"""
+
+
+class SearchResults:
+    """
+    Новости, подходящие под запрос, в порядке релевантности.
+
+    Поддерживает count() и срезы, поэтому отдаётся прямо в Paginator:
+    каждая страница — один запрос с LIMIT/OFFSET по индексу FTS5.
+    """
+
+    def __init__(self, query):
+        self.match = build_match_query(query)
+
+    def _execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, (self.match, self.match, *params))
+            return cursor.fetchall()
+
+    def count(self):
+        if not self.match:
+            return 0
+        return self._execute(
+            f'SELECT COUNT(*) FROM ({RANKED_NEWS_SQL})'
+        )[0][0]
+
+    def __getitem__(self, page):
+        if not self.match:
+            return []
+        rows = self._execute(
+            f'{RANKED_NEWS_SQL} ORDER BY rank, news_id DESC '
+            'LIMIT %s OFFSET %s',
+            (page.stop - page.start, page.start)
+        )
+        news = News.objects.defer('text').in_bulk(
+            [news_id for news_id, _ in rows]
+        )
+        return [news[news_id] for news_id, _ in rows if news_id in news]
+
+
+def search_news(query):
+    """
+    Результаты поиска, пригодные для Paginator.
+
+    Запрос без слов ничего не находит на любой СУБД.
+    """
+    if connection.vendor == 'sqlite':
+        return SearchResults(query)
+    if not build_match_query(query):
+        return News.objects.none()
+    return News.objects.filter(
+        Q(title__icontains=query)
+        | Q(text__icontains=query)
+        | Q(comment__text__icontains=query, comment__is_hidden=False)
+    ).defer('text').distinct()
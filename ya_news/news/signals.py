@@ -0,0 +1,19 @@
+from .models import Comment, news_changed
+
+
+def remember_comment_news(sender, instance, **kwargs):
+    """Запоминает новости, комментарии к которым удалятся с автором."""
+    # Каскад удаляет комментарии в обход Comment.delete и
+    # CommentQuerySet.delete, поэтому счётчики пересчитываются здесь.
+    instance._comment_news_ids = set(
+        Comment.objects.filter(author=instance).values_list(
+            'news_id', flat=True
+        )
+    )
+
+
+def recount_comment_news(sender, instance, **kwargs):
+    """Пересчитывает счётчики новостей после удаления автора."""
+    news_ids = getattr(instance, '_comment_news_ids', None)
+    if news_ids:
+        news_changed(news_ids)
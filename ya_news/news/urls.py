@@ -4,13 +4,34 @@ from news import views
 
 app_name = 'news'
 
-urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
-    path(
-        'delete_comment/<int:pk>/',
-        views.CommentDelete.as_view(),
-        name='delete'
-    ),
-    path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
-]
+
+def get_urlpatterns(news_list, news_detail):
+    return [
+        path('', news_list, name='home'),
+        path('search/', views.NewsSearch.as_view(), name='search'),
+        path('export/', views.NewsExport.as_view(), name='export'),
+        path('news/<int:pk>/', news_detail, name='detail'),
+        path(
+            'news/<int:pk>/comments/',
+            views.NewsComments.as_view(),
+            name='comments'
+        ),
+        path(
+            'delete_comment/<int:pk>/',
+            views.CommentDelete.as_view(),
+            name='delete'
+        ),
+        path(
+            'edit_comment/<int:pk>/',
+            views.CommentUpdate.as_view(),
+            name='edit'
+        ),
+    ]
+
+
+urlpatterns = get_urlpatterns(
+    views.NewsList.as_view(), views.NewsDetailView.as_view()
+)
+# Под ASGI (yanews/asgi_urls.py) список и страница новости
+# асинхронные; под WSGI синхронные представления дешевле.
+async_urlpatterns = get_urlpatterns(views.news_list, views.news_detail)
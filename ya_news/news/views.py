@@ -1,47 +1,191 @@
+from concurrent import futures
+from http import HTTPStatus
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db import close_old_connections
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.crypto import salted_hmac
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
+from yacommon.stats import track_queries
 
+from .cache import (
+    HOME_SCOPE, AnonymousCacheMixin, detail_scope, get_version
+)
+from .export import FORMATS, iter_news_with_comments, spool
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import get_keyset_page
+from .search import search_news
+from .writer import WRITE_TIMEOUT_ERROR, comment_writer
+
+
+def conditional(get_state):
+    """
+    Декоратор класса: ответ 304 на условный GET неизменившейся страницы.
+
+    get_state(request, **kwargs) возвращает пару (время изменения,
+    версия) и вызывается один раз за запрос. ETag строится из версии,
+    а если её нет — из времени; Last-Modified отдаётся только по
+    времени и только анонимам. Страница пользователя зависит от него
+    самого и содержит CSRF-токен, поэтому его ETag включает id
+    пользователя и отпечаток CSRF-секрета: после нового входа токен
+    другой, и старая копия страницы не должна получить 304.
+    """
+    def state(request, *args, **kwargs):
+        if not hasattr(request, 'news_state'):
+            request.news_state = get_state(request, *args, **kwargs)
+        return request.news_state
+
+    def etag(request, *args, **kwargs):
+        value, version = state(request, *args, **kwargs)
+        if version is None:
+            if value is None:
+                return None
+            version = value.timestamp()
+        if not request.user.is_authenticated:
+            return f'{version}-0'
+        secret = salted_hmac(
+            'news.views.conditional', request.META.get('CSRF_COOKIE', '')
+        ).hexdigest()[:16]
+        return f'{version}-{request.user.pk}-{secret}'
+
+    def last_modified(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        value, _ = state(request, *args, **kwargs)
+        return value
+
+    return method_decorator(
+        condition(etag_func=etag, last_modified_func=last_modified),
+        name='dispatch'
+    )
 
 
-class NewsList(generic.ListView):
+def get_news(request, pk):
+    """Новость по pk; загружается один раз за запрос."""
+    news = getattr(request, 'news', None)
+    if news is None or news.pk != pk:
+        news = request.news = get_object_or_404(News, pk=pk)
+    return news
+
+
+def get_home_state(request):
+    # Главная зависит от всех новостей. Версия области кеша главной
+    # меняется при любом их изменении, удалении и при изменении
+    # комментариев и читается без запроса к базе.
+    return None, get_version(HOME_SCOPE)
+
+
+def get_news_state(request, pk):
+    return get_news(request, pk).modified, None
+
+
+@conditional(get_home_state)
+class NewsList(AnonymousCacheMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    cache_scope = HOME_SCOPE
+    cache_params = ('after',)
 
     def get_queryset(self):
         """
-        Выводим только несколько последних новостей.
+        Выводим несколько новостей, начиная с курсора ?after=.
 
         Их количество определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        page, self.next_cursor = get_keyset_page(
+            # Полный текст на главной не нужен, выводится анонс.
+            self.model.objects.defer('text'),
+            'date',
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+            after=self.request.GET.get('after'),
+            descending=True,
+        )
+        return page
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        return context
+
+
+class NewsSearch(generic.ListView):
+    """Поиск по новостям и комментариям к ним."""
+    template_name = 'news/search.html'
+    paginate_by = settings.NEWS_COUNT_ON_HOME_PAGE
+
+    def get_queryset(self):
+        return search_news(self.get_query())
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        return context
+
 
+def get_comments_page(news, after=None):
+    """Страница комментариев к новости, начиная с курсора."""
+    comments, next_cursor = get_keyset_page(
+        news.comment_set.filter(is_hidden=False).select_related('author'),
+        'created',
+        settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+        after=after,
+    )
+    return {
+        'comments': comments,
+        'next_cursor': next_cursor,
+        'comment_cache_timeout': settings.COMMENT_CACHE_TIMEOUT,
+    }
 
-class NewsDetail(generic.DetailView):
+
+@conditional(get_news_state)
+class NewsDetail(AnonymousCacheMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
+    def get_cache_scope(self):
+        return detail_scope(self.kwargs['pk'])
+
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_news(self.request, self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context.update(get_comments_page(self.object))
         if self.request.user.is_authenticated:
             context['form'] = CommentForm()
         return context
 
 
+@conditional(get_news_state)
+class NewsComments(AnonymousCacheMixin, generic.TemplateView):
+    """Очередная страница комментариев, подгружаемая по курсору."""
+    template_name = 'news/comments.html'
+    cache_params = ('after',)
+
+    def get_cache_scope(self):
+        return detail_scope(self.kwargs['pk'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['news'] = get_news(self.request, self.kwargs['pk'])
+        context.update(get_comments_page(
+            context['news'], self.request.GET.get('after')
+        ))
+        return context
+
+
 class NewsComment(
         LoginRequiredMixin,
         generic.detail.SingleObjectMixin,
@@ -55,11 +199,26 @@ class NewsComment(
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(get_comments_page(self.object))
+        return context
+
     def form_valid(self, form):
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        if settings.NEWS_COMMENT_WRITE_QUEUE:
+            try:
+                comment_writer.save(comment)
+            except futures.TimeoutError:
+                # Комментарий снят с очереди, повтор не создаст дубликат.
+                form.add_error(None, WRITE_TIMEOUT_ERROR)
+                response = self.form_invalid(form)
+                response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+                return response
+        else:
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -68,14 +227,52 @@ class NewsComment(
 
 
 class NewsDetailView(generic.View):
+    # Функции представлений строятся один раз, а не на каждый запрос.
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        return self.detail_view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
+
+
+def async_view(view):
+    """
+    Асинхронная версия синхронного представления для ASGI.
+
+    Django 3.2 выполняет синхронные представления под ASGI в одном
+    общем потоке, и медленные клиенты ждут друг друга. Здесь GET
+    вместе с отрисовкой шаблона выполняется в пуле потоков, а
+    соединения с базой этого потока закрываются по CONN_MAX_AGE так
+    же, как в конце обычного запроса. Остальные методы пишут в базу и
+    остаются в общем потоке, как обычные синхронные представления.
+    """
+    def run(request, *args, **kwargs):
+        close_old_connections()
+        try:
+            with track_queries(request):
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    run_in_pool = sync_to_async(run, thread_sensitive=False)
+    run_in_main_thread = sync_to_async(view)
+
+    async def async_wrapper(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await run_in_pool(request, *args, **kwargs)
+        return await run_in_main_thread(request, *args, **kwargs)
+
+    return async_wrapper
+
+
+news_list = async_view(NewsList.as_view())
+news_detail = async_view(NewsDetailView.as_view())
 
 
 class CommentBase(LoginRequiredMixin):
@@ -102,3 +299,29 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+
+class NewsExport(UserPassesTestMixin, generic.View):
+    """Выгрузка всех новостей с комментариями для сотрудников."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'jsonl')
+        if export_format not in FORMATS:
+            raise Http404('Неизвестный формат выгрузки.')
+        serialize, content_type = FORMATS[export_format]
+        chunks = serialize(iter_news_with_comments())
+        content_type = f'{content_type}; charset=utf-8'
+        if isinstance(request, ASGIRequest):
+            # Django 3.2 под ASGI перебирает потоковый ответ в цикле
+            # событий, где ORM недоступен. Выгрузка пишется во временный
+            # файл здесь, в потоке представления, и отдаётся из него.
+            response = FileResponse(spool(chunks), content_type=content_type)
+        else:
+            response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="news.{export_format}"'
+        )
+        return response
@@ -0,0 +1,116 @@
+"""
+Групповая запись комментариев.
+
+SQLite допускает одного писателя, и при всплеске комментариев потоки
+запросов простаивают в ожидании блокировки. Вместо этого запросы
+ставят комментарии в очередь, а фоновый поток сохраняет накопившееся
+за несколько миллисекунд одной транзакцией. Запрос дожидается записи
+своего комментария, поэтому после перенаправления автор его увидит.
+
+Если запись не началась за NEWS_COMMENT_WRITE_TIMEOUT, комментарий
+снимается с очереди: повторная отправка не создаст дубликат.
+"""
+import queue
+import threading
+import time
+from concurrent import futures
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Max
+
+from .models import Comment
+
+WRITE_TIMEOUT_ERROR = 'Не удалось сохранить комментарий, попробуйте ещё раз.'
+
+
+class CommentWriter:
+    """Фоновый поток, сохраняющий комментарии пачками."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='comment-writer', daemon=True
+                )
+                self.thread.start()
+
+    def submit(self, comment):
+        """Ставит комментарий в очередь, возвращает Future записи."""
+        self.start()
+        future = futures.Future()
+        self.queue.put((comment, future))
+        return future
+
+    def save(self, comment):
+        """
+        Сохраняет комментарий через очередь и ждёт записи.
+
+        TimeoutError означает, что комментарий не записан и снят
+        с очереди. Уже начатую запись save дожидается до конца.
+        """
+        future = self.submit(comment)
+        try:
+            return future.result(timeout=settings.NEWS_COMMENT_WRITE_TIMEOUT)
+        except futures.TimeoutError:
+            if future.cancel():
+                raise
+            return future.result()
+
+    def collect(self):
+        """Первый комментарий из очереди и всё, что придёт следом."""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + settings.NEWS_COMMENT_WRITE_DELAY
+        while len(batch) < settings.NEWS_COMMENT_WRITE_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        # Отменённые по таймауту комментарии не записываются.
+        return [
+            item for item in batch if item[1].set_running_or_notify_cancel()
+        ]
+
+    def run(self):
+        while True:
+            self.flush(self.collect())
+
+    def flush(self, batch):
+        if not batch:
+            return
+        close_old_connections()
+        try:
+            with transaction.atomic():
+                comments = [comment for comment, _ in batch]
+                if not connection.features.can_return_rows_from_bulk_insert:
+                    # bulk_create на SQLite в Django 3.2 не заполняет pk.
+                    # Транзакция начинается с BEGIN IMMEDIATE, поэтому
+                    # до её конца других писателей нет и следующие id
+                    # свободны.
+                    start = (
+                        Comment.objects.aggregate(Max('pk'))['pk__max'] or 0
+                    ) + 1
+                    for pk, comment in enumerate(comments, start):
+                        comment.pk = pk
+                Comment.objects.bulk_create(comments)
+        except Exception as error:
+            if len(batch) > 1:
+                # Ошибка одной записи не должна отменять остальные.
+                for item in batch:
+                    self.flush([item])
+                return
+            batch[0][1].set_exception(error)
+        else:
+            for comment, future in batch:
+                future.set_result(comment)
+
+
+comment_writer = CommentWriter()
@@ -0,0 +1,18 @@
+"""
+URL-адреса для ASGI-сервера.
+
+Те же адреса, что и в yanews.urls, но список и страница новости
+обслуживаются асинхронными представлениями. Выбирается в asgi.py.
+"""
+from django.urls import include, path
+
+from news.urls import app_name, async_urlpatterns
+from yanews import urls
+
+urlpatterns = [
+    path('', include((async_urlpatterns, app_name))),
+    *(
+        pattern for pattern in urls.urlpatterns
+        if getattr(pattern, 'namespace', None) != app_name
+    ),
+]
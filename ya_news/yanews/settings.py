@@ -1,9 +1,15 @@
+import os
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий код проектов (пакет yacommon) лежит в корне репозитория.
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
 DEBUG = True
@@ -21,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yacommon.stats.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,13 +58,100 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+# yacommon.sqlite3 — SQLite с OPTIONS['transaction_mode'] из Django 5.1.
+DB_ENGINE = os.getenv('DB_ENGINE', 'yacommon.sqlite3')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DB_ENGINE,
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': os.getenv('DB_USER', ''),
+        'PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        # Постоянные соединения: каждый поток сервера держит своё
+        # соединение между запросами вместо открытия нового.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        # Файл тестовой базы задаёт parallel_tests.py: у каждого потока
+        # тестов своя копия заранее мигрированного шаблона.
+        'TEST': {'NAME': os.getenv('TEST_DB_NAME')},
+        # IMMEDIATE: транзакция сразу берёт блокировку записи, и
+        # параллельные писатели ждут busy_timeout, а не падают с
+        # "database is locked" при попытке начать запись.
+        'OPTIONS': {
+            'transaction_mode': os.getenv('DB_TRANSACTION_MODE', 'IMMEDIATE'),
+        } if DB_ENGINE == 'yacommon.sqlite3' else {},
     }
 }
 
+# Проверять постоянные соединения в начале запроса и переоткрывать
+# оборвавшиеся (в Django 3.2 нет CONN_HEALTH_CHECKS).
+DB_HEALTH_CHECKS = os.getenv('DB_HEALTH_CHECKS') == '1'
+
+# Применяются к каждому новому соединению с SQLite. WAL позволяет
+# читать во время записи, а busy_timeout — ждать освобождения базы
+# другим писателем вместо немедленной ошибки "database is locked".
+# Ожидание работает, только если транзакция берёт блокировку в начале:
+# см. transaction_mode в DATABASES.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+} if os.getenv('DB_SQLITE_TUNING', '1') == '1' else {}
+
+
+# locmem у каждого процесса свой: сброс кеша страниц в одном процессе
+# не виден другим. При нескольких процессах сервера — file.
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanews',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('NEWS_CACHE_LOCATION', BASE_DIR / '.cache'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('NEWS_CACHE_BACKEND', 'locmem')],
+    # Отрисованные комментарии: отдельно, чтобы их количество
+    # не вытесняло страницы из кеша по умолчанию.
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanews-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+NEWS_CACHE_TIMEOUT = int(os.getenv('NEWS_CACHE_TIMEOUT', 300))
+COMMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
+REQUEST_STATS_ENABLED = os.getenv('REQUEST_STATS_ENABLED') == '1'
+REQUEST_STATS_WINDOW = 1000
+
+
+# Хранилище сессий: db (по умолчанию), cached_db — чтение из кеша,
+# signed_cookies — без обращений к базе, но данные сессии видны
+# клиенту (подписаны, не зашифрованы).
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.getenv('SESSION_BACKEND', 'db')]
+
+# Пользователь запроса берётся из кеша по умолчанию, если тот общий
+# для процессов (не locmem); 0 отключает кеширование. ModelBackend
+# остаётся в списке для сессий, созданных до кеширования: в них
+# сохранён его путь, и без него пользователи разлогинились бы.
+AUTHENTICATION_BACKENDS = [
+    'yacommon.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', 60))
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +174,15 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 20
+
+BAD_WORDS_FILE = os.getenv('BAD_WORDS_FILE')
+
+# Групповая запись комментариев фоновым потоком (news/writer.py):
+# пауза на сбор пачки в секундах, размер пачки и сколько запрос ждёт
+# записи своего комментария.
+NEWS_COMMENT_WRITE_QUEUE = os.getenv('NEWS_COMMENT_WRITE_QUEUE') == '1'
+NEWS_COMMENT_WRITE_DELAY = 0.005
+NEWS_COMMENT_WRITE_BATCH_SIZE = 100
+NEWS_COMMENT_WRITE_TIMEOUT = 10
@@ -3,10 +3,12 @@ from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
+from yacommon.stats import stats_view
 
 urlpatterns = [
     path('', include('news.urls')),
     path('admin/', admin.site.urls),
+    path('__stats__/', stats_view, name='request_stats'),
 ]
 
 auth_urls = ([
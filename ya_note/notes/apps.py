@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from yacommon import db
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from yacommon import auth
+
+        connection_created.connect(db.tune_sqlite)
+        post_save.connect(auth.forget_user, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(auth.forget_user, sender=settings.AUTH_USER_MODEL)
+        if settings.DB_HEALTH_CHECKS:
+            request_started.connect(db.check_connections)
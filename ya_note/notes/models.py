@@ -1,7 +1,9 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .slugs import make_unique_slug
+
+SLUG_SAVE_ATTEMPTS = 3
 
 
 class Note(models.Model):
@@ -28,11 +30,31 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        for attempt in range(SLUG_SAVE_ATTEMPTS):
+            try:
+                # На SQLite транзакция начинается с BEGIN IMMEDIATE
+                # (transaction_mode в settings): выбор slug и вставка
+                # идут под блокировкой записи, параллельные сохранения
+                # ждут своей очереди.
+                with transaction.atomic():
+                    self.slug = make_unique_slug(
+                        Note.objects.exclude(pk=self.pk),
+                        self.title, max_slug_length
+                    )
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Тот же slug мог занять параллельный запрос.
+                if attempt == SLUG_SAVE_ATTEMPTS - 1:
+                    raise
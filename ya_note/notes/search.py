@@ -0,0 +1,20 @@
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from yacommon.search import build_match_query
+
+FTS_MATCH_SQL = (
+    'SELECT rowid FROM notes_note_fts WHERE notes_note_fts MATCH %s'
+)
+
+
+def search_notes(queryset, query):
+    """Заметки из queryset, в заголовке или тексте которых есть query."""
+    match = build_match_query(query)
+    if not match:
+        return queryset
+    if connection.vendor != 'sqlite':
+        return queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        )
+    return queryset.filter(id__in=RawSQL(FTS_MATCH_SQL, (match,)))
@@ -0,0 +1,49 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Cast, Substr
+from pytils.translit import slugify
+
+DEFAULT_SLUG = 'note'
+# Место под номер в slug: дефис и до десяти цифр.
+SUFFIX_LENGTH = 11
+
+# Заголовки часто повторяются, а транслитерация pytils не бесплатна.
+cached_slugify = lru_cache(maxsize=settings.SLUGIFY_CACHE_SIZE)(slugify)
+
+
+def slugify_cache_info():
+    """Статистика кеша транслитерации: hits, misses, maxsize, currsize."""
+    return cached_slugify.cache_info()
+
+
+def make_unique_slug(queryset, title, max_length):
+    """
+    Возвращает свободный slug для заголовка: base, base-2, base-3...
+
+    Один запрос по диапазону уникального индекса slug выбирает только
+    base и варианты вида base-<номер>; наибольший номер считается
+    в базе. Для длинного заголовка номер дописывается к началу base,
+    которое оставляет место под SUFFIX_LENGTH символов.
+    """
+    base = cached_slugify(title)[:max_length] or DEFAULT_SLUG
+    stem = base[:max_length - SUFFIX_LENGTH]
+    position = len(stem) + 2
+    numbered = Q(
+        slug__gte=f'{stem}-', slug__lt=f'{stem}.',
+        slug__regex=rf'^{re.escape(stem)}-[0-9]+$',
+    )
+    found = queryset.filter(Q(slug=base) | numbered).aggregate(
+        base_taken=Count('pk', filter=Q(slug=base)),
+        number=Max(
+            Cast(Substr('slug', position), models.BigIntegerField()),
+            filter=numbered,
+        ),
+    )
+    if not found['base_taken']:
+        return base
+    number = max(found['number'] or 0, 1) + 1
+    return f'{stem}-{number}'
@@ -0,0 +1,23 @@
+import pytest
+from django.core.cache import cache
+from yacommon.snapshot import setup_test_database
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(
+    request, django_test_environment, django_db_blocker,
+    django_db_keepdb, django_db_createdb
+):
+    """Тестовая база из снимка; --create-db пересобирает снимок."""
+    with django_db_blocker.unblock():
+        teardown = setup_test_database(
+            rebuild=django_db_createdb, keepdb=django_db_keepdb
+        )
+    yield
+    with django_db_blocker.unblock():
+        teardown()
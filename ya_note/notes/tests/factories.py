@@ -0,0 +1,44 @@
+"""
+Заметки для тестов.
+
+slug заметки вычисляется из заголовка и заранее назначенного pk без
+запросов к базе. Общие помощники — bulk_create, make_text,
+make_users — находятся в yacommon.factories.
+"""
+import random
+
+from yacommon.factories import BATCH_SIZE, make_text, next_pk
+
+from notes.models import Note
+from notes.slugs import DEFAULT_SLUG, cached_slugify
+
+WORDS = (
+    'покупки', 'работа', 'идеи', 'книги', 'встреча',
+    'поездка', 'рецепт', 'здоровье', 'учёба', 'проект',
+)
+
+
+def make_slug(title, pk):
+    """Slug из заголовка с pk в суффиксе — уникален без запросов к базе."""
+    max_length = Note._meta.get_field('slug').max_length
+    suffix = f'-{pk}'
+    base = cached_slugify(title) or DEFAULT_SLUG
+    return base[:max_length - len(suffix)] + suffix
+
+
+def make_notes(authors, per_author, seed=0):
+    """Заметки каждого автора с заранее вычисленными slug."""
+    rnd = random.Random(seed)
+    notes = []
+    owners = (author for author in authors for _ in range(per_author))
+    for pk, author in enumerate(owners, next_pk(Note)):
+        title = make_text(rnd, 3, WORDS)
+        notes.append(Note(
+            pk=pk,
+            title=title,
+            text=make_text(rnd, 20, WORDS),
+            slug=make_slug(title, pk),
+            author=author,
+        ))
+    Note.objects.bulk_create(notes, batch_size=BATCH_SIZE)
+    return notes
@@ -0,0 +1,19 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Проверки числа SQL-запросов для TestCase."""
+
+    def count_queries(self, client, url):
+        """Считает SQL-запросы, которых стоит GET-запрос клиента к url."""
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        return len(context)
+
+    def assert_query_budget(self, client, url, budget):
+        queries = self.count_queries(client, url)
+        self.assertLessEqual(
+            queries, budget,
+            f'{url}: {queries} SQL-запросов при бюджете {budget}'
+        )
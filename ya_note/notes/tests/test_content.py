@@ -1,10 +1,13 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.test.client import Client
 from django.urls import reverse
+from yacommon.stats import request_stats
 
 from notes.forms import NoteForm
 from notes.models import Note
+from notes.tests.factories import make_notes
 
 User = get_user_model()
 SLUG = 'note-slug'
@@ -59,6 +62,56 @@ class TestContent(TestCase):
         note_count = object_list.count()
         self.assertEqual(note_count, 0)
 
+    def test_notes_list_pagination(self):
+        """Тест - список заметок разбит на страницы."""
+        make_notes([self.author], settings.NOTES_COUNT_ON_LIST_PAGE)
+        response = self.author_client.get(LIST_URL)
+        self.assertEqual(
+            len(response.context['object_list']),
+            settings.NOTES_COUNT_ON_LIST_PAGE
+        )
+        response = self.author_client.get(LIST_URL, {'page': 2})
+        self.assertEqual(len(response.context['object_list']), 1)
+
+    def test_notes_search(self):
+        """
+        Тест - поиск находит заметки по словам из заголовка
+        и текста только среди заметок пользователя.
+        """
+        Note.objects.create(
+            title='Покупки', text='Молоко и хлеб', author=self.not_author
+        )
+        cases = (
+            (self.author_client, 'заголов', [self.note]),
+            (self.author_client, 'ТЕКСТ заметки', [self.note]),
+            (self.author_client, 'молоко', []),
+            (self.not_author_client, 'молоко', None),
+            (self.author_client, '"*)(', [self.note]),
+        )
+        for client, query, expected in cases:
+            with self.subTest(query=query):
+                response = client.get(LIST_URL, {'q': query})
+                object_list = list(response.context['object_list'])
+                if expected is None:
+                    self.assertEqual(len(object_list), 1)
+                    self.assertEqual(object_list[0].title, 'Покупки')
+                else:
+                    self.assertEqual(object_list, expected)
+
+    @override_settings(REQUEST_STATS_ENABLED=True)
+    def test_request_stats(self):
+        """Тест - замеры запросов в Server-Timing и в сводке по URL."""
+        request_stats.clear()
+        author_client = Client()
+        author_client.force_login(self.author)
+        response = author_client.get(LIST_URL)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        staff = User.objects.create(username='Сотрудник', is_staff=True)
+        staff_client = Client()
+        staff_client.force_login(staff)
+        stats = staff_client.get(reverse('request_stats')).json()
+        self.assertEqual(stats['notes:list']['count'], 1)
+
     def test_pages_contains_form(self):
         """
         Тест - на страницы создания и редактирования заметки
@@ -1,13 +1,20 @@
-from pytils.translit import slugify
+import threading
 from http import HTTPStatus
 
+from pytils.translit import slugify
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 from django.test.client import Client
 from django.urls import reverse
+from yacommon.factories import PASSWORD, make_users
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import cached_slugify, slugify_cache_info
+from notes.tests.factories import make_notes
 
 User = get_user_model()
 SLUG = 'note-slug'
@@ -68,6 +75,76 @@ class TestLogicCreate(TestCase):
         self.assertEqual(new_note.text, self.form_data['text'])
         self.assertEqual(new_note.author, self.author)
 
+    def test_empty_slug_collision(self):
+        """
+        Тест - при совпадении автосозданного 'slug'
+        к нему добавляется свободный номер.
+        """
+        self.form_data.pop('slug')
+        expected_slug = slugify(self.form_data['title'])
+        Note.objects.bulk_create(
+            Note(title='Заметка', text='Текст', slug=slug, author=self.author)
+            for slug in (expected_slug, f'{expected_slug}-2')
+        )
+        response = self.author_client.post(ADD_URL, data=self.form_data)
+        self.assertRedirects(response, DONE_URL)
+        new_note = Note.objects.get(title=self.form_data['title'])
+        self.assertEqual(new_note.slug, f'{expected_slug}-3')
+
+    def test_slug_number_ignores_other_titles(self):
+        """Тест - номер slug считается только по вариантам base-<номер>."""
+        self.form_data.pop('slug')
+        expected_slug = slugify(self.form_data['title'])
+        Note.objects.bulk_create(
+            Note(title='Заметка', text='Текст', slug=slug, author=self.author)
+            for slug in (
+                expected_slug, f'{expected_slug}-o-pogode',
+                f'{expected_slug}-9', f'{expected_slug}-10',
+            )
+        )
+        self.author_client.post(ADD_URL, data=self.form_data)
+        new_note = Note.objects.get(title=self.form_data['title'])
+        self.assertEqual(new_note.slug, f'{expected_slug}-11')
+
+    def test_long_title_slug_collision(self):
+        """Тест - номер помещается в slug максимальной длины."""
+        title = 'а' * 100
+        notes = [
+            Note.objects.create(title=title, text='Текст', author=self.author)
+            for _ in range(3)
+        ]
+        slugs = [note.slug for note in notes]
+        self.assertEqual(len(set(slugs)), 3)
+        self.assertTrue(all(len(slug) <= 100 for slug in slugs))
+        self.assertTrue(slugs[2].endswith('-3'))
+
+    def test_slugify_cache(self):
+        """Тест - повторная транслитерация заголовка берётся из кеша."""
+        cached_slugify.cache_clear()
+        for _ in range(2):
+            Note.objects.create(
+                title='Повтор', text='Текст', author=self.author
+            )
+        info = slugify_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_factories_create_notes_in_bulk(self):
+        """Тест - фабрики создают заметки с pk и уникальными slug."""
+        users = make_users(3)
+        notes = make_notes(users, 10, seed=1)
+        self.assertEqual(Note.objects.count(), 30)
+        self.assertEqual(len({note.slug for note in notes}), 30)
+        self.assertTrue(users[0].check_password(PASSWORD))
+        self.assertEqual(Note.objects.get(pk=notes[0].pk).slug, notes[0].slug)
+
+    def test_sqlite_connection_tuning(self):
+        """Тест - к соединению с SQLite применены SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            synchronous = cursor.fetchone()[0]
+        # 1 — NORMAL, 2 — FULL, значение SQLite по умолчанию.
+        self.assertEqual(synchronous, 1 if settings.SQLITE_PRAGMAS else 2)
+
 
 class TestLogicEdit(TestCase):
 
@@ -138,3 +215,38 @@ class TestLogicEdit(TestCase):
         response = self.not_author_client.post(DELETE_URL)
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertEqual(Note.objects.count(), note_count)
+
+
+class TestConcurrentCreate(TransactionTestCase):
+
+    def test_concurrent_notes_get_unique_slugs(self):
+        """Тест - одновременные заметки получают разные slug без ошибок."""
+        authors = make_users(4)
+        errors = []
+
+        def add_notes(author):
+            client = Client()
+            client.force_login(author)
+            try:
+                for _ in range(10):
+                    response = client.post(ADD_URL, data={
+                        'title': 'Популярный заголовок', 'text': 'Текст'
+                    })
+                    if response.status_code != HTTPStatus.FOUND:
+                        errors.append(response.status_code)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=add_notes, args=(author,))
+            for author in authors
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        slugs = Note.objects.values_list('slug', flat=True)
+        self.assertEqual(len(set(slugs)), 40)
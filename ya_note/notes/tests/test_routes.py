@@ -1,11 +1,17 @@
 from http import HTTPStatus
+from tempfile import TemporaryDirectory
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.test.client import Client
 from django.urls import reverse
+from yacommon.auth import user_cache_key
+from yacommon.factories import make_users
 
 from notes.models import Note
+from notes.tests.factories import make_notes
+from notes.tests.mixins import QueryBudgetMixin
 
 User = get_user_model()
 SLUG = 'note-slug'
@@ -21,7 +27,7 @@ ADD_URL = reverse('notes:add')
 DONE_URL = reverse('notes:success')
 
 
-class TestRoutes(TestCase):
+class TestRoutes(QueryBudgetMixin, TestCase):
 
     @classmethod
     def setUpTestData(cls):
@@ -90,3 +96,62 @@ class TestRoutes(TestCase):
                     )
                 else:
                     self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_pages_query_budget(self):
+        """Тест - страницы укладываются в бюджет SQL-запросов."""
+        budgets = (
+            (self.client, HOME_URL, 0),
+            (self.client, LOGIN_URL, 0),
+            (self.client, SIGNUP_URL, 0),
+            (self.client, LOGOUT_URL, 0),
+            (self.author_client, HOME_URL, 2),
+            (self.author_client, DETAIL_URL, 3),
+            (self.author_client, EDIT_URL, 3),
+            (self.author_client, DELETE_URL, 3),
+            (self.author_client, LIST_URL, 4),
+            (self.author_client, ADD_URL, 2),
+            (self.author_client, DONE_URL, 2),
+            (self.not_author_client, DETAIL_URL, 3),
+            (self.not_author_client, LIST_URL, 3),
+        )
+        for client, url, budget in budgets:
+            with self.subTest(url=url, budget=budget):
+                self.assert_query_budget(client, url, budget)
+
+    def test_list_queries_do_not_grow_with_data(self):
+        """Тест - число запросов к списку не зависит от числа заметок."""
+        queries = self.count_queries(self.author_client, LIST_URL)
+        make_notes([self.author], 1000)
+        make_notes(make_users(50), 20)
+        self.assertEqual(
+            self.count_queries(self.author_client, LIST_URL), queries
+        )
+
+    def test_user_cache_is_reset_on_save(self):
+        """Тест - пользователь из общего кеша сбрасывается при изменении."""
+        with TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {
+                'BACKEND': (
+                    'django.core.cache.backends.filebased.FileBasedCache'
+                ),
+                'LOCATION': location,
+            },
+        }):
+            self.author_client.get(LIST_URL)
+            self.assertIsNotNone(cache.get(user_cache_key(self.author.pk)))
+            self.author.first_name = 'Имя'
+            self.author.save()
+            self.assertIsNone(cache.get(user_cache_key(self.author.pk)))
+
+    def test_session_with_model_backend(self):
+        """Тест - сессия, созданная с ModelBackend, остаётся действительной."""
+        client = Client()
+        client.force_login(
+            self.author, backend='django.contrib.auth.backends.ModelBackend'
+        )
+        self.assertEqual(client.get(EDIT_URL).status_code, HTTPStatus.OK)
+
+    def test_user_is_not_cached_in_locmem(self):
+        """Тест - в кеше одного процесса пользователь не хранится."""
+        self.author_client.get(LIST_URL)
+        self.assertIsNone(cache.get(user_cache_key(self.author.pk)))
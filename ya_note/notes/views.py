@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.views import generic
 
 from .forms import NoteForm
 from .models import Note
+from .search import search_notes
 
 
 class Home(generic.TemplateView):
@@ -50,8 +52,21 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """Список заметок пользователя с поиском и разбивкой на страницы."""
     template_name = 'notes/list.html'
+    paginate_by = settings.NOTES_COUNT_ON_LIST_PAGE
+
+    def get_queryset(self):
+        queryset = super().get_queryset().order_by('id')
+        query = self.request.GET.get('q', '').strip()
+        if query:
+            queryset = search_notes(queryset, query)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '').strip()
+        return context
 
 
 class NoteDetail(NoteBase, generic.DetailView):
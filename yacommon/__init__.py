@@ -0,0 +1 @@
+"""Общий код проектов YaNews и YaNote."""
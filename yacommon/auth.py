@@ -0,0 +1,49 @@
+"""
+Кеш пользователя запроса.
+
+Пользователь нужен каждому запросу с сессией, а меняется редко, поэтому
+CachedModelBackend недолго держит его в кеше по умолчанию. Запись
+сбрасывает forget_user при сохранении и удалении пользователя.
+
+Кеш работает, только если кеш по умолчанию общий для процессов
+сервера: в locmem сброс виден лишь процессу, где пользователь
+изменился, и остальные отдавали бы устаревшую запись. QuerySet.update()
+сигналов не посылает: после массового изменения пользователей записи
+живут до USER_CACHE_TIMEOUT, если не вызвать forget_user для каждого.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def user_cache_enabled():
+    """Кеш пользователя включён и кеш по умолчанию общий."""
+    return bool(settings.USER_CACHE_TIMEOUT) and not isinstance(
+        caches[DEFAULT_CACHE_ALIAS], LocMemCache
+    )
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя из общего кеша."""
+
+    def get_user(self, user_id):
+        if not user_cache_enabled():
+            return super().get_user(user_id)
+        cache = caches[DEFAULT_CACHE_ALIAS]
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+
+
+def forget_user(sender, instance, **kwargs):
+    """Сбрасывает закешированного пользователя после его изменения."""
+    caches[DEFAULT_CACHE_ALIAS].delete(user_cache_key(instance.pk))
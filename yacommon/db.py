@@ -0,0 +1,20 @@
+"""Обработчики сигналов для соединений с базой данных."""
+from django.conf import settings
+from django.db import connections
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS для нового соединения с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    # Напрямую через драйвер: эти запросы не должны попадать
+    # в счётчики запросов и статистику.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def check_connections(**kwargs):
+    """Закрывает неработающие постоянные соединения перед запросом."""
+    for connection in connections.all():
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
@@ -0,0 +1,45 @@
+"""
+Массовое создание тестовых данных через bulk_create.
+
+Первичные ключи назначаются заранее, поэтому объекты возвращаются
+уже с pk и без повторной выборки. Тексты строятся генератором
+случайных чисел с фиксированным seed: данные одинаковы в каждом
+запуске. Функции работают и в фикстурах pytest, и в TestCase;
+фабрики моделей лежат рядом с тестами каждого проекта.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+
+PASSWORD = 'password'
+BATCH_SIZE = 1000
+
+
+def next_pk(model):
+    return (model.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+
+
+def bulk_create(model, objects):
+    """Сохраняет объекты пачками, заранее присвоив им первичные ключи."""
+    for pk, obj in enumerate(objects, next_pk(model)):
+        obj.pk = pk
+    model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+    return objects
+
+
+def make_text(rnd, words, vocabulary):
+    """Текст из words случайных слов словаря vocabulary."""
+    return ' '.join(
+        rnd.choice(vocabulary) for _ in range(words)
+    ).capitalize()
+
+
+def make_users(count, prefix='Пользователь', password=PASSWORD):
+    """Пользователи с одним заранее захэшированным паролем."""
+    User = get_user_model()
+    # Хэширование намеренно медленное, поэтому считаем его один раз.
+    password = make_password(password)
+    return bulk_create(User, [
+        User(username=f'{prefix} {index}', password=password)
+        for index in range(count)
+    ])
@@ -0,0 +1,13 @@
+"""Общее для полнотекстового поиска на SQLite FTS5."""
+import re
+
+
+def build_match_query(query):
+    """
+    Запрос FTS5 из пользовательской строки.
+
+    Каждое слово берётся в кавычки и ищется по префиксу, поэтому
+    операторы и спецсимволы FTS5 в строке поиска ничего не ломают.
+    Пустая строка означает, что в запросе нет ни одного слова.
+    """
+    return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', query))
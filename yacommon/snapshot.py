@@ -0,0 +1,84 @@
+"""
+Снимки мигрированной тестовой базы.
+
+Миграции прогоняются один раз, результат сохраняется в SQLite-файл,
+имя которого — хэш файлов миграций. Следующие запуски восстанавливают
+базу из снимка через backup API вместо миграций. Изменилась любая
+миграция или версия Django — будет построен новый снимок.
+"""
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+SNAPSHOT_DIR = Path(settings.BASE_DIR) / '.test-snapshots'
+
+
+def migrations_hash():
+    """Хэш версии Django и файлов миграций всех приложений."""
+    digest = hashlib.sha256(django.get_version().encode())
+    for app_config in sorted(
+        apps.get_app_configs(), key=lambda app_config: app_config.label
+    ):
+        for path in sorted(Path(app_config.path).glob('migrations/*.py')):
+            digest.update(f'{app_config.label}/{path.name}'.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def save_snapshot(path):
+    """Копирует текущую тестовую базу в файл снимка."""
+    path.parent.mkdir(exist_ok=True)
+    # Пишем во временный файл: параллельные процессы не должны увидеть
+    # недописанный снимок.
+    temporary = path.with_name(f'{path.name}.{os.getpid()}')
+    target = sqlite3.connect(temporary)
+    try:
+        connection.ensure_connection()
+        connection.connection.backup(target)
+    finally:
+        target.close()
+    os.replace(temporary, path)
+
+
+def restore_snapshot(path):
+    """Создаёт тестовую базу из снимка, возвращает прежнее имя базы."""
+    old_name = connection.settings_dict['NAME']
+    test_name = connection.creation._get_test_db_name()
+    connection.close()
+    settings.DATABASES[connection.alias]['NAME'] = test_name
+    connection.settings_dict['NAME'] = test_name
+    connection.ensure_connection()
+    source = sqlite3.connect(path)
+    try:
+        source.backup(connection.connection)
+    finally:
+        source.close()
+    return old_name
+
+
+def setup_test_database(rebuild=False, keepdb=False):
+    """
+    Готовит тестовую базу и возвращает функцию для её удаления.
+
+    Снимки поддерживаются только для SQLite, для остальных СУБД база
+    создаётся как обычно.
+    """
+    if connection.vendor != 'sqlite':
+        config = setup_databases(verbosity=0, interactive=False, keepdb=keepdb)
+        return lambda: teardown_databases(config, verbosity=0, keepdb=keepdb)
+    path = SNAPSHOT_DIR / f'{migrations_hash()}.sqlite3'
+    if rebuild or not path.exists():
+        config = setup_databases(verbosity=0, interactive=False, keepdb=keepdb)
+        save_snapshot(path)
+        return lambda: teardown_databases(config, verbosity=0, keepdb=keepdb)
+    old_name = restore_snapshot(path)
+    return lambda: connection.creation.destroy_test_db(
+        old_name, verbosity=0, keepdb=keepdb
+    )
@@ -0,0 +1,40 @@
+"""
+SQLite с выбором режима транзакций, как OPTIONS['transaction_mode']
+в Django 5.1.
+
+Транзакция SQLite по умолчанию (DEFERRED) берёт блокировку записи
+только на первой записи. Если к этому моменту базу изменил другой
+писатель, SQLite сразу возвращает "database is locked", не дожидаясь
+busy_timeout. BEGIN IMMEDIATE берёт блокировку в начале транзакции,
+и конкурирующие писатели ждут друг друга.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transaction_mode = None
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        transaction_mode = params.pop('transaction_mode', None)
+        if transaction_mode is not None:
+            transaction_mode = transaction_mode.upper()
+            if transaction_mode not in TRANSACTION_MODES:
+                raise ImproperlyConfigured(
+                    'transaction_mode должен быть одним из '
+                    f'{", ".join(TRANSACTION_MODES)}.'
+                )
+        self.transaction_mode = transaction_mode
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            self.cursor().execute('BEGIN')
+        else:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
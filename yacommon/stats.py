@@ -0,0 +1,141 @@
+"""
+Статистика стоимости запросов: SQL, шаблоны, размер ответа.
+
+Включается настройкой REQUEST_STATS_ENABLED. Когда она выключена,
+middleware исключается из цепочки ещё при старте и ничего не стоит.
+"""
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.db import connections
+from django.http import Http404, JsonResponse
+
+METRICS = ('total_ms', 'db_ms', 'queries', 'render_ms', 'size')
+
+
+class RequestStats:
+    """Последние замеры по каждому имени URL и их перцентили."""
+
+    def __init__(self, window):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+
+    def add(self, url_name, sample):
+        with self.lock:
+            self.samples[url_name].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    @staticmethod
+    def percentile(values, percent):
+        return values[max(math.ceil(len(values) * percent / 100) - 1, 0)]
+
+    def summary(self):
+        with self.lock:
+            samples = {name: list(rows) for name, rows in self.samples.items()}
+        result = {}
+        for name, rows in samples.items():
+            result[name] = {'count': len(rows)}
+            for index, metric in enumerate(METRICS):
+                values = sorted(row[index] for row in rows)
+                result[name][metric] = {
+                    f'p{percent}': self.percentile(values, percent)
+                    for percent in (50, 95, 99)
+                }
+        return result
+
+
+request_stats = RequestStats(getattr(settings, 'REQUEST_STATS_WINDOW', 1000))
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper: число и суммарное время SQL-запросов."""
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.queries += 1
+
+
+@contextmanager
+def track_queries(request):
+    """
+    Учитывает SQL-запросы текущего потока в статистике запроса.
+
+    Middleware замеряет соединения своего потока. Код, который
+    обрабатывает запрос в другом потоке, оборачивается в track_queries.
+    """
+    timer = getattr(request, 'query_timer', None)
+    with ExitStack() as stack:
+        if timer is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+        yield
+
+
+class RequestStatsMiddleware:
+    """Замеряет запрос и отдаёт результат в заголовке Server-Timing."""
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_STATS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = request.query_timer = QueryTimer()
+        request.render_duration = 0.0
+        started = time.perf_counter()
+        with track_queries(request):
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        size = 0 if response.streaming else len(response.content)
+        url_name = (
+            request.resolver_match.view_name
+            if request.resolver_match else None
+        )
+        request_stats.add(url_name, (
+            total * 1000, timer.duration * 1000, timer.queries,
+            request.render_duration * 1000, size
+        ))
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timer.duration * 1000:.2f};desc="{timer.queries} SQL"',
+            f'render;dur={request.render_duration * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        return response
+
+    def process_template_response(self, request, response):
+        # Middleware стоит первым, поэтому этот метод вызывается последним,
+        # непосредственно перед отрисовкой шаблона.
+        started = time.perf_counter()
+
+        def finish(response):
+            request.render_duration += time.perf_counter() - started
+
+        response.add_post_render_callback(finish)
+        return response
+
+
+def stats_view(request):
+    """Перцентили p50/p95/p99 по именам URL, только для сотрудников."""
+    if not settings.REQUEST_STATS_ENABLED:
+        raise Http404
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse(request_stats.summary(), json_dumps_params={
+        'ensure_ascii': False, 'indent': 2
+    })